@@ -0,0 +1,87 @@
+""" module anticipation
+
+Réflexion pendant le tour de l'adversaire: pendant que la requête au
+serveur est en cours, un fil d'exécution cherche notre meilleure réplique
+aux coups adverses les plus probables. Les résultats sont indexés par la
+clé de Zobrist de la position atteinte.
+"""
+
+import threading
+
+from recherche import PROFONDEUR_MAX, Recherche
+
+
+class Anticipation:
+    """
+    Recherche en arrière-plan sur les réponses probables de l'adversaire
+
+    réponses: nombre de coups adverses étudiés, les mieux classés par
+    Recherche.coups. Les réponses sont approfondies à tour de rôle, une
+    profondeur à la fois, jusqu'à l'appel de arrêter ou de réplique.
+    """
+    def __init__(self, réponses=6, largeur_murs=8):
+        self.réponses = réponses
+        self.largeur_murs = largeur_murs
+        self.résultats = {}
+        self._arrêt = threading.Event()
+        self._fil = None
+        self._en_cours = None
+
+    def démarrer(self, position):
+        """Lance la réflexion sur une copie de position (l'adversaire au trait)."""
+        self.arrêter()
+        self.résultats = {}
+        self._arrêt.clear()
+        self._fil = threading.Thread(target=self._réfléchir, args=(position.copie(),),
+                                     daemon=True)
+        self._fil.start()
+
+    def arrêter(self):
+        """Interrompt la recherche en cours et attend la fin du fil."""
+        self._arrêt.set()
+        while self._fil is not None and self._fil.is_alive():
+            # La recherche relit son échéance à chaque noeud.
+            recherche = self._en_cours
+            if recherche is not None:
+                recherche.échéance = 0.0
+            self._fil.join(0.005)
+        self._fil = None
+
+    def réplique(self, position):
+        """Arrête la réflexion; retourne (code, profondeur, temps) préparé pour position.
+
+        temps: secondes de recherche consacrées à la position. Retourne None
+        si la position n'a pas été étudiée. Le résultat est destiné au
+        paramètre prévu de Quoridor.jouer_coup.
+        """
+        self.arrêter()
+        entrée = self.résultats.get(position.clé)
+        if entrée is None or entrée[0] != position.compact():
+            return None
+        return entrée[1:]
+
+    def _réfléchir(self, position):
+        générateur = Recherche(largeur_murs=self.largeur_murs)
+        recherches = []
+        for code in générateur.coups(position)[:self.réponses]:
+            suite = position.copie()
+            suite.appliquer(code)
+            if suite.gagnant() is None:
+                recherches.append((suite, Recherche(largeur_murs=self.largeur_murs)))
+        meilleurs = [None] * len(recherches)
+        temps = [0.0] * len(recherches)
+        for profondeur in range(1, PROFONDEUR_MAX + 1):
+            for indice, (suite, recherche) in enumerate(recherches):
+                if self._arrêt.is_set():
+                    return
+                self._en_cours = recherche
+                recherche.profondeur = profondeur
+                # Une itération de plus, le meilleur coup précédent d'abord.
+                code = recherche.meilleur_coup(suite, meilleurs[indice], profondeur)
+                temps[indice] += recherche.durée
+                if recherche.profondeur_atteinte == profondeur:
+                    meilleurs[indice] = code
+                    self.résultats[suite.clé] = (suite.compact(), code, profondeur,
+                                                 temps[indice])
+            if not recherches:
+                return
@@ -1,50 +1,104 @@
 """Quoridor - module api"""
+import os
+import statistics
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+URL_BASE = os.environ.get("QUORIDOR_URL", "https://python.gel.ulaval.ca/quoridor/api/")
+
+
+class ClientQuoridor:
+    """
+    Client du serveur Quoridor
+
+    Une seule session garde ses connexions ouvertes d'une requête à l'autre.
+    Les erreurs passagères sont réessayées avec un délai croissant: toutes
+    pour GET, mais pour POST (débuter/, jouer/) seulement les échecs de
+    connexion, où rien n'a été envoyé; un coup n'est jamais soumis deux
+    fois. La durée de chaque requête est notée dans latences.
+    """
+    def __init__(self, url_base=URL_BASE, délai=(3.05, 10), essais=3, attente=0.3,
+                 connexions=10):
+        self.url_base = url_base
+        self.délai = délai
+        self.latences = {}
+        relance = Retry(total=essais, connect=essais, read=essais, backoff_factor=attente,
+                        status_forcelist=(500, 502, 503, 504),
+                        allowed_methods=frozenset(("GET",)),
+                        raise_on_status=False)
+        adaptateur = HTTPAdapter(pool_connections=connexions, pool_maxsize=connexions,
+                                 max_retries=relance)
+        self.session = requests.Session()
+        self.session.mount("https://", adaptateur)
+        self.session.mount("http://", adaptateur)
+
+    def fermer(self):
+        """Ferme les connexions de la session."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def _requête(self, méthode, chemin, **kwargs):
+        """Envoie la requête et retourne la réponse JSON décodée."""
+        url_req = self.url_base + chemin
+        début = time.perf_counter()
+        rep = self.session.request(méthode, url_req, timeout=self.délai, **kwargs)
+        self.latences.setdefault(chemin, []).append(time.perf_counter() - début)
+
+        if rep.status_code != 200:
+            raise RuntimeError(
+                f"Le {méthode} sur {url_req} a produit le code d'erreur {rep.status_code}.")
+
+        rep = rep.json()
+
+        if "message" in rep.keys():
+            raise RuntimeError(rep["message"])
+
+        return rep
+
+    def statistiques(self):
+        """Nombre, moyenne, médiane et maximum des latences (s) par point d'accès."""
+        return {chemin: {'requêtes': len(durées),
+                         'moyenne': statistics.mean(durées),
+                         'médiane': statistics.median(durées),
+                         'max': max(durées)}
+                for chemin, durées in self.latences.items()}
+
+    def lister_parties(self, idul):
+        """Retourne en sortie la liste des parties reçus du serveur."""
+        return self._requête("GET", "lister/", params={"idul": idul})["parties"]
+
+    def débuter_partie(self, idul):
+        """Retourne en sortie un tuple constitué de l'identifiant de la partie et de l'état du jeu."""
+        rep = self._requête("POST", "débuter/", data={"idul": idul})
+        return rep["id"], rep["état"]
+
+    def jouer_coup(self, id_partie, type_coup, position):
+        """Retourne en sortie l'état actuel du jeu."""
+        return self._requête("POST", "jouer/",
+                             data={"id": id_partie, "type": type_coup, "pos": position})["état"]
+
+
+CLIENT = ClientQuoridor()
 
 
 def lister_parties(idul):
     """Retourne en sortie la liste des parties reçus du serveur."""
-    url_req = "https://python.gel.ulaval.ca/quoridor/api/lister/"
-    rep = requests.get(url_req, params={"idul": idul})
-
-    if rep.status_code != 200:
-        raise RuntimeError(f"Le GET sur {url_req} a produit le code d'erreur {rep.status_code}.")
-
-    rep = rep.json()
-
-    if "message" in rep.keys():
-        raise RuntimeError(rep["message"])
-
-    return rep["parties"]
+    return CLIENT.lister_parties(idul)
 
 
 def débuter_partie(idul):
     """Retourne en sortie un tuple constitué de l'identifiant de la partie et de l'état du jeu."""
-    url_req = "https://python.gel.ulaval.ca/quoridor/api/débuter/"
-    rep = requests.post(url_req, data={"idul": idul})
-
-    if rep.status_code != 200:
-        raise RuntimeError(f"Le POST sur {url_req} a produit le code d'erreur {rep.status_code}.")
-
-    rep = rep.json()
-
-    if "message" in rep.keys():
-        raise RuntimeError(rep["message"])
-
-    return rep["id"], rep["état"]
+    return CLIENT.débuter_partie(idul)
 
 
 def jouer_coup(id_partie, type_coup, position):
     """Retourne en sortie l'état actuel du jeu."""
-    url_req = "https://python.gel.ulaval.ca/quoridor/api/jouer/"
-    rep = requests.post(url_req, data={"id": id_partie, "type": type_coup, "pos": position})
-
-    if rep.status_code != 200:
-        raise RuntimeError(f"Le POST sur {url_req} a produit le code d'erreur {rep.status_code}.")
-
-    rep = rep.json()
-
-    if "message" in rep.keys():
-        raise RuntimeError(rep["message"])
-
-    return rep["état"]
+    return CLIENT.jouer_coup(id_partie, type_coup, position)
@@ -0,0 +1,86 @@
+"""Quoridor - module api_async
+
+Version asyncio (aiohttp) du module api, pour mener plusieurs parties à la
+fois depuis un seul processus.
+"""
+import asyncio
+import time
+
+import aiohttp
+
+from api import URL_BASE
+
+
+class ClientQuoridorAsync:
+    """
+    Client asynchrone du serveur Quoridor
+
+    Même comportement que api.ClientQuoridor: une session partagée, un
+    délai par requête, des essais répétés sur les erreurs passagères
+    (pour POST, seulement les échecs de connexion) et la durée de chaque
+    requête dans latences. S'utilise avec async with.
+    """
+    def __init__(self, url_base=URL_BASE, délai=10, essais=3, attente=0.3, connexions=100):
+        self.url_base = url_base
+        self.délai = aiohttp.ClientTimeout(total=délai)
+        self.essais = essais
+        self.attente = attente
+        self.connexions = connexions
+        self.latences = {}
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connexions), timeout=self.délai)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _requête(self, méthode, chemin, **kwargs):
+        """Envoie la requête et retourne la réponse JSON décodée."""
+        url_req = self.url_base + chemin
+        début = time.perf_counter()
+        # Un POST déjà envoyé (débuter/, jouer/) n'est jamais renvoyé: le
+        # serveur a pu l'appliquer même si la réponse s'est perdue.
+        relançable = méthode == "GET"
+        for essai in range(self.essais + 1):
+            dernier = essai == self.essais
+            try:
+                async with self.session.request(méthode, url_req, **kwargs) as rep:
+                    statut = rep.status
+                    if statut < 500 or not relançable or dernier:
+                        contenu = await rep.json(content_type=None) if statut == 200 else None
+                        break
+            except aiohttp.ClientConnectorError:
+                # Connexion impossible: rien n'a été envoyé.
+                if dernier:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not relançable or dernier:
+                    raise
+            await asyncio.sleep(self.attente * 2 ** essai)
+        self.latences.setdefault(chemin, []).append(time.perf_counter() - début)
+
+        if statut != 200:
+            raise RuntimeError(f"Le {méthode} sur {url_req} a produit le code d'erreur {statut}.")
+
+        if "message" in contenu.keys():
+            raise RuntimeError(contenu["message"])
+
+        return contenu
+
+    async def lister_parties(self, idul):
+        """Retourne en sortie la liste des parties reçus du serveur."""
+        return (await self._requête("GET", "lister/", params={"idul": idul}))["parties"]
+
+    async def débuter_partie(self, idul):
+        """Retourne en sortie un tuple constitué de l'identifiant de la partie et de l'état du jeu."""
+        rep = await self._requête("POST", "débuter/", data={"idul": idul})
+        return rep["id"], rep["état"]
+
+    async def jouer_coup(self, id_partie, type_coup, position):
+        """Retourne en sortie l'état actuel du jeu."""
+        données = [("id", id_partie), ("type", type_coup)]
+        données += [("pos", str(valeur)) for valeur in position]
+        return (await self._requête("POST", "jouer/", data=données))["état"]
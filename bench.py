@@ -0,0 +1,226 @@
+"""Quoridor - module bench
+
+Mesures des chemins critiques du moteur sur un petit corpus de positions
+(ouverture, milieu de partie chargé en murs, finale): opérations par
+seconde et mémoire allouée au plus fort d'une opération (tracemalloc).
+
+    python bench.py                    # compare à bench_reference.json
+    python bench.py --enregistrer      # remplace la référence
+    python bench.py --démarrage        # ajoute le démarrage de main.py -l, -a, -x
+
+Le code de sortie vaut 1 si une mesure ralentit de plus que le seuil.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from plateau import OBJECTIFS
+from quoridor import Quoridor, construire_graphe
+
+MURS_MILIEU = {'horizontaux': [[2, 2], [5, 2], [3, 3], [1, 4], [4, 4], [6, 4], [8, 4],
+                               [2, 5], [1, 6], [5, 7]],
+               'verticaux': [[2, 2], [5, 2]]}
+
+MURS_FINALE = {'horizontaux': [[2, 2], [5, 2], [3, 3], [1, 4], [4, 4], [6, 4], [8, 4],
+                               [2, 5], [1, 6], [5, 7], [7, 7], [2, 8], [1, 9], [4, 9]],
+               'verticaux': [[2, 2], [5, 2], [4, 3], [4, 5]]}
+
+CORPUS = {
+    'ouverture': {'joueurs': [{'nom': '1', 'murs': 10, 'pos': [5, 2]},
+                              {'nom': '2', 'murs': 10, 'pos': [5, 8]}],
+                  'murs': {'horizontaux': [], 'verticaux': []}},
+    'milieu': {'joueurs': [{'nom': '1', 'murs': 4, 'pos': [3, 4]},
+                           {'nom': '2', 'murs': 4, 'pos': [7, 6]}],
+               'murs': MURS_MILIEU},
+    'finale': {'joueurs': [{'nom': '1', 'murs': 1, 'pos': [3, 8]},
+                           {'nom': '2', 'murs': 1, 'pos': [2, 5]}],
+               'murs': MURS_FINALE},
+}
+
+
+def partie(état):
+    """Nouvelle partie dans l'état donné."""
+    return Quoridor(état['joueurs'], état['murs'])
+
+
+def opérations(état):
+    """{nom: fonction sans argument} des opérations mesurées sur état."""
+    joueurs = [joueur['pos'] for joueur in état['joueurs']]
+    q = partie(état)
+    type_mur, x, y = next(coup for coup in q.coups_légaux(1) if coup[0] != 'D')
+    sens = 'horizontal' if type_mur == 'MH' else 'vertical'
+    # auto_placer_mur ne regarde que la longueur des chemins.
+    chemin1 = [None] * (q.plateau.distance(q.état.pions[0], OBJECTIFS[0]) + 1)
+    chemin2 = [None] * (q.plateau.distance(q.état.pions[1], OBJECTIFS[1]) + 1)
+
+    def placer_mur():
+        q.placer_mur(1, (x, y), sens)
+        q.annuler_mur(1, (x, y), sens)
+
+    def jouer_coup():
+        random.seed(0)
+        partie(état).jouer_coup(1)
+
+    def auto_placer_mur():
+        partie(état).auto_placer_mur(1, chemin1, chemin2)
+
+    return {
+        'Quoridor': lambda: partie(état),
+        'construire_graphe': lambda: construire_graphe(joueurs, état['murs']['horizontaux'],
+                                                       état['murs']['verticaux']),
+        'placer_mur': placer_mur,
+        'jouer_coup': jouer_coup,
+        'auto_placer_mur': auto_placer_mur,
+        'chercher_coup': lambda: q.chercher_coup(1, profondeur=2),
+        'coups_légaux': lambda: list(q.coups_légaux(1)),
+        '__str__': lambda: str(q),
+    }
+
+
+def mesurer(fonction, durée=0.2, séries=5):
+    """(opérations par seconde, octets alloués au plus fort d'un appel).
+
+    Le débit retenu est celui de la meilleure de séries mesures, moins
+    sensible aux autres processus de la machine; une première série sert
+    de mise en train.
+    """
+    débit = 0
+    for série in range(séries + 1):
+        répétitions = 0
+        début = time.perf_counter()
+        while True:
+            fonction()
+            répétitions += 1
+            écoulé = time.perf_counter() - début
+            if écoulé >= durée / séries:
+                break
+        if série:
+            débit = max(débit, répétitions / écoulé)
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fonction()
+    pointe = tracemalloc.get_traced_memory()[1] - avant
+    tracemalloc.stop()
+    return débit, pointe
+
+
+# Ce que main.py importe et prépare avant sa première requête au serveur.
+CODE_DÉMARRAGE = ("import sys; sys.argv = ['main.py', {option!r}, 'idul']; import main; "
+                  "args = main.analyser_commande(); args.lister or main.classe_jeu(args)")
+
+
+def mesurer_démarrage(option, répétitions=5):
+    """Durée médiane (s) du démarrage de main.py option dans un nouvel interpréteur."""
+    commande = [sys.executable, '-c', CODE_DÉMARRAGE.format(option=option)]
+    durées = []
+    for _ in range(répétitions):
+        début = time.perf_counter()
+        subprocess.run(commande, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        durées.append(time.perf_counter() - début)
+    return statistics.median(durées)
+
+
+def lancer(durée=0.2, filtre=None, démarrage=False):
+    """Mesure toutes les opérations sur tout le corpus, et le démarrage si demandé."""
+    résultats = {}
+    if démarrage:
+        for option in ('-l', '-a', '-x'):
+            clé = f"démarrage/{option}"
+            if filtre and filtre not in clé:
+                continue
+            try:
+                secondes = mesurer_démarrage(option)
+            except subprocess.CalledProcessError:
+                print(f"{clé}: échec du démarrage", file=sys.stderr)
+                continue
+            résultats[clé] = {'ops_s': 1 / secondes, 'secondes': secondes}
+    for nom_position, état in CORPUS.items():
+        for nom, fonction in opérations(état).items():
+            clé = f"{nom}/{nom_position}"
+            if filtre and filtre not in clé:
+                continue
+            ops, mémoire = mesurer(fonction, durée)
+            résultats[clé] = {'ops_s': ops, 'mémoire': mémoire}
+    return résultats
+
+
+def comparer(résultats, référence, seuil):
+    """Clés dont le débit a baissé de plus de seuil (fraction) par rapport à la référence."""
+    régressions = []
+    for clé, mesure in résultats.items():
+        avant = référence.get(clé)
+        if avant and mesure['ops_s'] < avant['ops_s'] * (1 - seuil):
+            régressions.append(clé)
+    return régressions
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Mesures de performance du moteur Quoridor")
+
+    parser.add_argument("-d", "--durée", type=float, default=0.2,
+                        help="Durée de mesure de chaque opération (s)")
+
+    parser.add_argument("-f", "--filtre", default=None,
+                        help="Ne mesurer que les clés qui contiennent ce texte")
+
+    parser.add_argument("-o", "--sortie", default="bench_resultats.json",
+                        help="Fichier JSON des résultats")
+
+    parser.add_argument("-r", "--référence", default="bench_reference.json",
+                        help="Fichier JSON de référence")
+
+    parser.add_argument("-s", "--seuil", type=float, default=0.25,
+                        help="Baisse de débit tolérée avant de signaler une régression")
+
+    parser.add_argument("--démarrage", action="store_true",
+                        help="Mesurer aussi le démarrage de main.py (-l, -a, -x)")
+
+    parser.add_argument("--enregistrer", action="store_true",
+                        help="Écrire les résultats comme nouvelle référence")
+
+    return parser.parse_args()
+
+
+def main():
+    """Lance les mesures, les écrit et les compare à la référence."""
+    args = analyser_commande()
+    résultats = lancer(args.durée, args.filtre, args.démarrage)
+    try:
+        with open(args.référence, encoding='utf-8') as fichier:
+            référence = json.load(fichier)
+    except FileNotFoundError:
+        référence = {}
+    régressions = set(comparer(résultats, référence, args.seuil))
+
+    if args.enregistrer:
+        # Avec un filtre, seules les clés mesurées sont remplacées.
+        nom_fichier, contenu = args.référence, dict(référence, **résultats)
+    else:
+        nom_fichier, contenu = args.sortie, résultats
+    with open(nom_fichier, 'w', encoding='utf-8') as fichier:
+        json.dump(contenu, fichier, indent=1, ensure_ascii=False, sort_keys=True)
+
+    for clé, mesure in résultats.items():
+        avant = référence.get(clé)
+        rapport = f"{mesure['ops_s'] / avant['ops_s']:6.2f}x" if avant else "     -"
+        marque = "  RÉGRESSION" if clé in régressions else ""
+        if 'secondes' in mesure:
+            print(f"{clé:32} {mesure['secondes'] * 1000:12.1f} ms               {rapport}{marque}")
+        else:
+            print(f"{clé:32} {mesure['ops_s']:12.1f} ops/s {mesure['mémoire']:9} o "
+                  f"{rapport}{marque}")
+    if régressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
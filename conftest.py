@@ -0,0 +1,40 @@
+"""Données communes des tests"""
+
+import copy
+
+import pytest
+
+from quoridor import Quoridor
+
+MURS_BLOQUÉS = {'horizontaux': [(2, 5), (4, 5), (1, 6), (3, 6), (7, 6), (5, 7), (8, 7), (3, 8),
+                                (5, 8), (2, 9), (4, 9), (7, 9)],
+                'verticaux': [(2, 3), (6, 5), (5, 6), (8, 6), (3, 7), (7, 7), (9, 8)]}
+# À quelques coups de là, un pion ne peut passer qu'une fois l'autre parti.
+JOUEURS_PRÈS_DU_BLOCAGE = [{'nom': 'a', 'murs': 1, 'pos': (7, 8)},
+                           {'nom': 'b', 'murs': 0, 'pos': (8, 8)}]
+# Le pion 1 n'a aucun chemin tant que le pion 2 occupe (9, 9): position
+# légale où distance_pion donne None.
+JOUEURS_BLOQUÉS = [{'nom': 'a', 'murs': 1, 'pos': (9, 8)},
+                   {'nom': 'b', 'murs': 0, 'pos': (9, 9)}]
+
+
+@pytest.fixture
+def partie_près_du_blocage():
+    """Partie dont la recherche rencontre des pions bloqués."""
+    return Quoridor(JOUEURS_PRÈS_DU_BLOCAGE, MURS_BLOQUÉS)
+
+
+@pytest.fixture
+def partie_bloquée():
+    """Partie où le pion 1 est bloqué par le pion 2."""
+    return Quoridor(JOUEURS_BLOQUÉS, MURS_BLOQUÉS)
+
+
+@pytest.fixture
+def partie_bloquée_avec_murs():
+    """partie_bloquée, un mur de moins sur le plateau et un de plus au joueur 2."""
+    joueurs = copy.deepcopy(JOUEURS_BLOQUÉS)
+    joueurs[1]['murs'] = 1
+    murs = copy.deepcopy(MURS_BLOQUÉS)
+    murs['horizontaux'].remove((2, 5))
+    return Quoridor(joueurs, murs)
@@ -0,0 +1,176 @@
+""" module enregistrement
+
+Format binaire compact des parties. Un fichier commence par MAGIQUE, puis
+les parties se suivent:
+
+    <I  longueur du reste de l'enregistrement
+    B   longueur du nom 1, puis le nom en UTF-8
+    B   longueur du nom 2, puis le nom en UTF-8
+    B   résultat: 0 inconnu, 1 ou 2 pour le gagnant
+    un octet par coup (plateau.code_coup), le joueur 1 commençant
+
+Le fichier voisin .idx contient la position (<Q) de chaque partie, pour
+lire la partie N directement par mmap.
+"""
+
+import collections
+import mmap
+import os
+import struct
+
+from plateau import coup
+from quoridor import Quoridor
+
+MAGIQUE = b'QRD1'
+_LONGUEUR = struct.Struct('<I')
+_POSITION = struct.Struct('<Q')
+
+Partie = collections.namedtuple('Partie', 'noms gagnant coups')
+
+
+def _encoder(noms, coups, gagnant):
+    """Enregistrement complet d'une partie, longueur comprise."""
+    contenu = bytearray()
+    for nom in noms:
+        # Coupé à 255 octets sans couper un caractère en deux.
+        octets = nom.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+        contenu.append(len(octets))
+        contenu += octets
+    contenu.append(gagnant or 0)
+    contenu += bytes(coups)
+    return _LONGUEUR.pack(len(contenu)) + contenu
+
+
+def _décoder(données, début):
+    """Partie qui commence à début dans données, et la position de la suivante."""
+    longueur, = _LONGUEUR.unpack_from(données, début)
+    i = début + _LONGUEUR.size
+    fin = i + longueur
+    noms = []
+    for _ in range(2):
+        taille = données[i]
+        noms.append(bytes(données[i + 1:i + 1 + taille]).decode('utf-8'))
+        i += 1 + taille
+    gagnant = données[i] or None
+    return Partie(tuple(noms), gagnant, bytes(données[i + 1:fin])), fin
+
+
+class ÉcrivainParties:
+    """
+    Ajoute des parties à la fin d'un fichier, et leurs positions à l'index
+
+    S'utilise avec with. Chaque partie est écrite dès l'appel à écrire.
+    """
+    def __init__(self, chemin, index=True):
+        self.fichier = open(chemin, 'ab')
+        if self.fichier.tell() == 0:
+            self.fichier.write(MAGIQUE)
+        self.index = open(chemin + '.idx', 'ab') if index else None
+
+    def écrire(self, noms, coups, gagnant=None):
+        """Ajoute une partie: coups est une suite de codes (0 à 255)."""
+        if self.index is not None:
+            self.index.write(_POSITION.pack(self.fichier.tell()))
+        self.fichier.write(_encoder(noms, coups, gagnant))
+
+    def fermer(self):
+        """Ferme le fichier et l'index."""
+        self.fichier.close()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def lire_parties(chemin):
+    """Génère les parties du fichier une à une, sans le charger en entier."""
+    with open(chemin, 'rb') as fichier:
+        if fichier.read(len(MAGIQUE)) != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un fichier de parties")
+        while True:
+            entête = fichier.read(_LONGUEUR.size)
+            if not entête:
+                return
+            longueur, = _LONGUEUR.unpack(entête)
+            partie, _ = _décoder(entête + fichier.read(longueur), 0)
+            yield partie
+
+
+def positions(partie):
+    """Génère la partie rejouée: l'état initial, puis celui après chaque coup.
+
+    C'est le même objet Quoridor, modifié sur place d'un coup à l'autre.
+    """
+    q = Quoridor(list(partie.noms))
+    yield q
+    for numéro, code in enumerate(partie.coups):
+        q.jouer(numéro % 2 + 1, coup(code))
+        yield q
+
+
+class ArchiveParties:
+    """
+    Accès direct à la partie N d'un fichier, projeté en mémoire (mmap)
+
+    Sans fichier .idx à jour, les positions des parties sont retrouvées par
+    un parcours du fichier.
+    """
+    def __init__(self, chemin):
+        self._fichier = open(chemin, 'rb')
+        self.données = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.données[:len(MAGIQUE)] != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un fichier de parties")
+        self.index = self._lire_index(chemin + '.idx')
+        self.positions = None
+        if self.index is None:
+            self.positions = []
+            début = len(MAGIQUE)
+            while début < len(self.données):
+                self.positions.append(début)
+                début += _LONGUEUR.size + _LONGUEUR.unpack_from(self.données, début)[0]
+
+    def _lire_index(self, chemin):
+        """Projection de l'index, ou None s'il manque ou ne correspond pas aux parties."""
+        if not os.path.exists(chemin) or os.path.getsize(chemin) == 0:
+            return None
+        with open(chemin, 'rb') as fichier:
+            index = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        dernière, = _POSITION.unpack_from(index, len(index) - _POSITION.size)
+        if (dernière + _LONGUEUR.size > len(self.données) or
+                dernière + _LONGUEUR.size + _LONGUEUR.unpack_from(self.données, dernière)[0]
+                != len(self.données)):
+            index.close()
+            return None
+        return index
+
+    def __len__(self):
+        if self.index is None:
+            return len(self.positions)
+        return len(self.index) // _POSITION.size
+
+    def __getitem__(self, numéro):
+        if self.index is None:
+            return _décoder(self.données, self.positions[numéro])[0]
+        if numéro < 0:
+            numéro += len(self)
+        if not 0 <= numéro < len(self):
+            raise IndexError("numéro de partie invalide")
+        return _décoder(self.données, _POSITION.unpack_from(self.index,
+                                                           numéro * _POSITION.size)[0])[0]
+
+    def fermer(self):
+        """Libère les projections et le fichier."""
+        if self.index is not None:
+            self.index.close()
+        self.données.close()
+        self._fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
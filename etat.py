@@ -0,0 +1,215 @@
+""" module etat
+
+État compact d'une partie: plateau en masques de bits, cases des pions,
+murs restants et joueur au trait, avec une clé de Zobrist tenue à jour à
+chaque coup joué (appliquer) ou annulé (annuler).
+"""
+
+import random
+
+from plateau import (MUR, NB_CASES, NB_EMPLACEMENTS, OBJECTIFS, SYMÉTRIES, Plateau, bits, case,
+                     mur, position, symétrie_murs)
+
+_HASARD = random.Random(20191206)
+ZOBRIST_PIONS = [[_HASARD.getrandbits(64) for _ in range(NB_CASES)] for _ in range(2)]
+ZOBRIST_MURS = [_HASARD.getrandbits(64) for _ in range(NB_EMPLACEMENTS)]
+ZOBRIST_RESTANTS = [[_HASARD.getrandbits(64) for _ in range(11)] for _ in range(2)]
+ZOBRIST_TRAIT = _HASARD.getrandbits(64)
+
+
+def _zobrist_symétrie(symétrie):
+    """Tables de Zobrist (pions, murs, restants, trait) vues à travers une des SYMÉTRIES.
+
+    Une clé calculée avec ces tables est celle de l'image de l'état.
+    """
+    cases, emplacements, échange = SYMÉTRIES[symétrie]
+    rôles = (1, 0) if échange else (0, 1)
+    return ([[ZOBRIST_PIONS[rôles[joueur]][cases[i]] for i in range(NB_CASES)]
+             for joueur in range(2)],
+            [ZOBRIST_MURS[emplacements[numéro]] for numéro in range(NB_EMPLACEMENTS)],
+            [ZOBRIST_RESTANTS[rôles[joueur]] for joueur in range(2)],
+            (ZOBRIST_TRAIT, 0) if échange else (0, ZOBRIST_TRAIT))
+
+
+ZOBRIST_SYMÉTRIES = tuple(_zobrist_symétrie(symétrie) for symétrie in range(1, len(SYMÉTRIES)))
+
+
+class EtatJeu:
+    """
+    État d'une partie modifié sur place par appliquer et annuler
+
+    Le hachage est la clé de Zobrist: il ne coûte rien. Un état se
+    transmet à un autre processus sous sa forme compacte (un tuple d'entiers).
+    """
+    __slots__ = ('plateau', 'pions', 'murs', 'trait', 'noms', 'clé', 'historique')
+
+    def __init__(self, plateau, pions, murs, trait=0, noms=('', '')):
+        self.plateau = plateau
+        self.pions = list(pions)
+        self.murs = list(murs)
+        self.trait = trait
+        self.noms = tuple(noms)
+        self.historique = []
+        self.clé = ZOBRIST_TRAIT if trait else 0
+        for joueur in range(2):
+            self.clé ^= ZOBRIST_PIONS[joueur][self.pions[joueur]]
+            self.clé ^= ZOBRIST_RESTANTS[joueur][self.murs[joueur]]
+        for numéro in bits(plateau.murs):
+            self.clé ^= ZOBRIST_MURS[numéro]
+
+    @classmethod
+    def depuis_dict(cls, état, trait=0):
+        """État correspondant au dictionnaire 'état' du serveur."""
+        joueurs = état['joueurs']
+        return cls(Plateau(état['murs']['horizontaux'], état['murs']['verticaux']),
+                   [case(joueur['pos']) for joueur in joueurs],
+                   [joueur['murs'] for joueur in joueurs],
+                   trait,
+                   [joueur['nom'] for joueur in joueurs])
+
+    def vers_dict(self):
+        """Dictionnaire 'état' au format du serveur."""
+        murs = {'horizontaux': [], 'verticaux': []}
+        for numéro in bits(self.plateau.murs):
+            orientation, position_mur = mur(numéro)
+            murs['horizontaux' if orientation == 'horizontal' else 'verticaux'].append(
+                position_mur)
+        return {'joueurs': [{'nom': self.noms[joueur], 'murs': self.murs[joueur],
+                             'pos': position(self.pions[joueur])} for joueur in range(2)],
+                'murs': murs}
+
+    @classmethod
+    def depuis_compact(cls, compact):
+        """État correspondant à la forme donnée par compact()."""
+        murs, pions, restants, trait = compact
+        return cls(Plateau.depuis_murs(murs), pions, restants, trait)
+
+    def compact(self):
+        """(masque des murs, (case 1, case 2), (murs 1, murs 2), joueur au trait)."""
+        return (self.plateau.murs, tuple(self.pions), tuple(self.murs), self.trait)
+
+    def __reduce__(self):
+        return (EtatJeu.depuis_compact, (self.compact(),))
+
+    def __hash__(self):
+        return self.clé
+
+    def __eq__(self, autre):
+        if not isinstance(autre, EtatJeu):
+            return NotImplemented
+        return self.compact() == autre.compact()
+
+    def clé_canonique(self):
+        """(clé, symétrie): la plus petite clé de Zobrist de l'état et de ses images.
+
+        Les positions équivalentes par les SYMÉTRIES ont la même clé
+        canonique. plateau.symétrie_coup(code, symétrie) donne le coup
+        correspondant dans la position canonique, et inversement.
+        """
+        meilleure, symétrie = self.clé, 0
+        murs = list(bits(self.plateau.murs))
+        pion1, pion2 = self.pions
+        restants1, restants2 = self.murs
+        for numéro, (pions, emplacements, restants, trait) in enumerate(ZOBRIST_SYMÉTRIES, 1):
+            clé = (trait[self.trait] ^ pions[0][pion1] ^ pions[1][pion2] ^
+                   restants[0][restants1] ^ restants[1][restants2])
+            for emplacement in murs:
+                clé ^= emplacements[emplacement]
+            if clé < meilleure:
+                meilleure, symétrie = clé, numéro
+        return meilleure, symétrie
+
+    def symétrique(self, symétrie):
+        """Image de l'état par une des SYMÉTRIES, sans historique."""
+        cases, _, échange = SYMÉTRIES[symétrie]
+        ordre = (1, 0) if échange else (0, 1)
+        return EtatJeu(Plateau.depuis_murs(symétrie_murs(self.plateau.murs, symétrie)),
+                       [cases[self.pions[joueur]] for joueur in ordre],
+                       [self.murs[joueur] for joueur in ordre],
+                       1 - self.trait if échange else self.trait,
+                       [self.noms[joueur] for joueur in ordre])
+
+    def copie(self, trait=None):
+        """Copie indépendante, sans historique; trait change le joueur au trait."""
+        copie = EtatJeu.__new__(EtatJeu)
+        copie.plateau = self.plateau.copie()
+        copie.pions = list(self.pions)
+        copie.murs = list(self.murs)
+        copie.trait = self.trait
+        copie.noms = self.noms
+        copie.clé = self.clé
+        copie.historique = []
+        if trait is not None and trait != self.trait:
+            copie.trait = trait
+            copie.clé ^= ZOBRIST_TRAIT
+        return copie
+
+    def appliquer(self, code, joueur=None):
+        """Joue le coup (voir plateau.code_coup) pour le joueur au trait ou joueur.
+
+        Aucune vérification: le coup doit être légal. Le trait passe ensuite
+        à l'autre joueur.
+        """
+        if joueur is None:
+            joueur = self.trait
+        if code < MUR:
+            ancienne = self.pions[joueur]
+            self.clé ^= ZOBRIST_PIONS[joueur][ancienne] ^ ZOBRIST_PIONS[joueur][code]
+            self.pions[joueur] = code
+        else:
+            ancienne = None
+            restants = self.murs[joueur]
+            self.plateau.ajouter_mur(code - MUR)
+            self.clé ^= (ZOBRIST_MURS[code - MUR] ^ ZOBRIST_RESTANTS[joueur][restants] ^
+                         ZOBRIST_RESTANTS[joueur][restants - 1])
+            self.murs[joueur] = restants - 1
+        self.historique.append((self.trait, joueur, ancienne))
+        if self.trait == joueur:
+            self.clé ^= ZOBRIST_TRAIT
+        self.trait = 1 - joueur
+
+    def annuler(self, code):
+        """Annule le dernier coup joué, qui doit être code."""
+        trait, joueur, ancienne = self.historique.pop()
+        if self.trait != trait:
+            self.clé ^= ZOBRIST_TRAIT
+        self.trait = trait
+        if code < MUR:
+            self.clé ^= ZOBRIST_PIONS[joueur][code] ^ ZOBRIST_PIONS[joueur][ancienne]
+            self.pions[joueur] = ancienne
+        else:
+            restants = self.murs[joueur]
+            self.plateau.retirer_mur(code - MUR)
+            self.clé ^= (ZOBRIST_MURS[code - MUR] ^ ZOBRIST_RESTANTS[joueur][restants] ^
+                         ZOBRIST_RESTANTS[joueur][restants + 1])
+            self.murs[joueur] = restants + 1
+
+    def rendre_mur(self, numéro, joueur):
+        """Retire un mur du plateau (pas forcément le dernier) et le rend au joueur."""
+        restants = self.murs[joueur]
+        self.plateau.retirer_mur(numéro)
+        self.clé ^= (ZOBRIST_MURS[numéro] ^ ZOBRIST_RESTANTS[joueur][restants] ^
+                     ZOBRIST_RESTANTS[joueur][restants + 1])
+        self.murs[joueur] = restants + 1
+
+    def coups_légaux(self, joueur=None):
+        """Codes des coups légaux du joueur (par défaut, celui au trait).
+
+        Les déplacements du pion d'abord, puis les murs si le joueur en a
+        encore. Aucun coup si la partie est terminée.
+        """
+        if joueur is None:
+            joueur = self.trait
+        if self.gagnant() is not None:
+            return
+        yield from bits(self.plateau.coups_pion(self.pions[joueur], self.pions[1 - joueur]))
+        if self.murs[joueur] > 0:
+            for numéro in bits(self.plateau.murs_légaux(*self.pions)):
+                yield MUR + numéro
+
+    def gagnant(self):
+        """Indice (0 ou 1) du joueur arrivé à son objectif, ou None."""
+        for joueur in range(2):
+            if (1 << self.pions[joueur]) & OBJECTIFS[joueur]:
+                return joueur
+        return None
@@ -0,0 +1,204 @@
+""" module evaluation_lot
+
+Caractéristiques heuristiques de nombreuses positions à la fois, avec
+NumPy: distance de chaque joueur à sa rangée d'arrivée, murs restants,
+mobilité du pion (plateau.coups_pion) et nombre de plus courts chemins.
+Les positions sont encodées en tableaux (encoder), puis traitées par blocs:
+un parcours en largeur depuis la rangée d'arrivée avance d'un niveau pour
+tout le bloc à la fois sur un tenseur de 9 x 9 cases par position, en
+comptant les plus courts chemins au passage.
+
+Indices des tenseurs: [rangée y - 1, colonne x - 1, position].
+
+    lot = encoder(q.état for q in positions(partie))
+    caractéristiques(lot)['distances']
+"""
+
+import collections
+
+import numpy as np
+
+from plateau import NB_EMPLACEMENTS, bits
+
+# murs: (N, 128) booléens par emplacement (plateau.emplacement); pions: (N, 2)
+# cases (plateau.case); restants: (N, 2) murs restants; trait: (N,) 0 ou 1.
+Lot = collections.namedtuple('Lot', 'murs pions restants trait')
+
+TAILLE_BLOC = 2048
+# Rangée d'arrivée (indice) de chaque joueur.
+ARRIVÉES = (8, 0)
+# Les nombres de chemins sont plafonnés: quatre voisins au plafond tiennent
+# encore sur 16 bits, et un plafond atteint se propage exactement.
+PLAFOND_CHEMINS = (1 << 14) - 1
+
+
+def encoder(positions):
+    """Lot de positions: des EtatJeu, des Quoridor ou des états au format du serveur.
+
+    Les valeurs sont copiées au passage: les positions peuvent être le même
+    objet modifié d'une position à l'autre (enregistrement.positions).
+    """
+    murs = []
+    pions = []
+    restants = []
+    trait = []
+    for position in positions:
+        if isinstance(position, dict):
+            from etat import EtatJeu
+            position = EtatJeu.depuis_dict(position)
+        position = getattr(position, 'état', position)
+        murs.append(position.plateau.murs)
+        pions.append(position.pions)
+        restants.append(position.murs)
+        trait.append(position.trait)
+    masques = np.zeros((len(murs), NB_EMPLACEMENTS), dtype=bool)
+    for indice, masque in enumerate(murs):
+        masques[indice, list(bits(masque))] = True
+    return Lot(masques,
+               np.array(pions, dtype=np.int16).reshape(-1, 2),
+               np.array(restants, dtype=np.int8).reshape(-1, 2),
+               np.array(trait, dtype=np.int8))
+
+
+def ouvertures(murs):
+    """Passages libres (nord, sud, est, ouest) de chaque case, en tenseurs (9, 9, N).
+
+    nord[r, c, n] est vrai si le pion de la position n peut aller de (r, c)
+    à (r + 1, c). La position est le dernier indice: chaque opération porte
+    alors sur des blocs contigus de positions.
+    """
+    taille = len(murs)
+    # Mur horizontal (x, y): entre les rangées y - 1 et y, colonnes x et x + 1.
+    horizontaux = murs[:, :64].T.reshape(8, 8, taille)
+    # Mur vertical (x, y): entre les colonnes x - 1 et x, rangées y et y + 1.
+    verticaux = murs[:, 64:].T.reshape(8, 8, taille)
+    nord = np.zeros((9, 9, taille), dtype=bool)
+    nord[:8, :] = True
+    nord[:8, :8] &= ~horizontaux
+    nord[:8, 1:] &= ~horizontaux
+    est = np.zeros((9, 9, taille), dtype=bool)
+    est[:, :8] = True
+    est[:8, :8] &= ~verticaux
+    est[1:, :8] &= ~verticaux
+    sud = np.zeros_like(nord)
+    sud[1:] = nord[:8]
+    ouest = np.zeros_like(est)
+    ouest[:, 1:] = est[:, :8]
+    return nord, sud, est, ouest
+
+
+def parcours(passages, arrivées, rangées, colonnes, compter=True):
+    """(distances, chemins) des cases données à leur rangée d'arrivée, par bloc.
+
+    Parcours en largeur depuis la rangée d'arrivée de chaque position: au
+    niveau k, une case reçoit la somme des chemins de ses voisins du niveau
+    k - 1, plafonnée à PLAFOND_CHEMINS. Les positions dont la case est
+    atteinte sont retirées du bloc en cours de route. Distance -1 et 0
+    chemin si la case est enfermée. Sans compter, le plafond est 1: le
+    front est un masque d'octets, deux fois plus léger, et chemins vaut 1
+    pour toute case atteinte.
+    """
+    type_ = np.uint16 if compter else np.uint8
+    nord, sud, est, ouest = (passage.astype(type_) for passage in passages)
+    taille = nord.shape[2]
+    actives = np.arange(taille)
+    front = np.zeros((9, 9, taille), dtype=type_)
+    front[arrivées, :, actives] = 1
+    # Plafond des cases pas encore atteintes, 0 pour les autres: un seul
+    # minimum masque et plafonne à la fois.
+    libres = np.where(front, 0, PLAFOND_CHEMINS if compter else 1).astype(type_)
+    distances = np.where(rangées == arrivées, 0, -1).astype(np.int16)
+    chemins = (rangées == arrivées).astype(np.int32)
+    reçus = np.empty_like(front)
+    produit = np.empty_like(front)
+    atteints = np.empty(front.shape, dtype=bool)
+    # Aucune case n'est à plus de 80 pas de son arrivée.
+    for niveau in range(1, 81):
+        restantes = distances[actives] < 0
+        if not restantes.all():
+            # Retire les positions terminées quand il en reste moins de la moitié.
+            if not restantes.any():
+                break
+            if restantes.sum() * 2 < len(actives):
+                actives = actives[restantes]
+                # compress garde les tableaux contigus, contrairement à [:, :, restantes].
+                nord, sud, est, ouest, front, libres = (
+                    np.compress(restantes, tableau, axis=2)
+                    for tableau in (nord, sud, est, ouest, front, libres))
+                reçus = np.empty_like(front)
+                produit = np.empty_like(front)
+                atteints = np.empty(front.shape, dtype=bool)
+        # Chemins arrivant par un pas vers le nord, le sud, l'est ou l'ouest.
+        np.multiply(front[1:], nord[:8], out=reçus[:8])
+        reçus[8] = 0
+        np.multiply(front[:8], sud[1:], out=produit[1:])
+        reçus[1:] += produit[1:]
+        np.multiply(front[:, 1:], est[:, :8], out=produit[:, :8])
+        reçus[:, :8] += produit[:, :8]
+        np.multiply(front[:, :8], ouest[:, 1:], out=produit[:, 1:])
+        reçus[:, 1:] += produit[:, 1:]
+        np.minimum(reçus, libres, out=reçus)
+        np.greater(reçus, 0, out=atteints)
+        np.copyto(libres, 0, where=atteints)
+        front, reçus = reçus, front
+        valeurs = front[rangées[actives], colonnes[actives], np.arange(len(actives))]
+        atteintes = (valeurs > 0) & (distances[actives] < 0)
+        distances[actives[atteintes]] = niveau
+        chemins[actives[atteintes]] = valeurs[atteintes]
+    return distances, chemins
+
+
+def mobilités(passages, pions):
+    """Nombre de coups de pion de chaque joueur (plateau.coups_pion), par bloc."""
+    taille = len(pions)
+    lignes = np.arange(taille)
+    rangées, colonnes = np.divmod(pions.astype(np.int64), 9)
+    # Pas (rangée, colonne) de chaque direction, dans l'ordre de passages.
+    pas = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    degrés = sum(passage.astype(np.int16) for passage in passages)
+    résultat = np.zeros((taille, 2), dtype=np.int16)
+    for joueur in range(2):
+        autre = 1 - joueur
+        r, c = rangées[:, joueur], colonnes[:, joueur]
+        ra, ca = rangées[:, autre], colonnes[:, autre]
+        total = degrés[r, c, lignes].copy()
+        for passage, (dr, dc) in zip(passages, pas):
+            # L'autre pion est à côté, sans mur entre les deux: saut en ligne
+            # droite s'il est libre, sinon vers chacun des autres voisins.
+            contact = passage[r, c, lignes] & (ra == r + dr) & (ca == c + dc)
+            droit = passage[ra, ca, lignes]
+            total += np.where(contact, np.where(droit, 0, degrés[ra, ca, lignes] - 2), 0)
+        résultat[:, joueur] = total
+    return résultat
+
+
+def caractéristiques(lot, taille_bloc=TAILLE_BLOC, chemins=True):
+    """Caractéristiques du lot, des tableaux (N, 2) indexés par joueur.
+
+    'distances': pas jusqu'à la rangée d'arrivée (-1 si enfermé);
+    'murs': murs restants; 'mobilité': coups de pion possibles;
+    'chemins': nombre de plus courts chemins vers la rangée d'arrivée,
+    plafonné à PLAFOND_CHEMINS (absent sans chemins: le calcul est alors
+    plus rapide). Les pions ne se bloquent pas pour les distances et les chemins.
+    """
+    nombre = len(lot.murs)
+    résultat = {'distances': np.empty((nombre, 2), dtype=np.int16),
+                'murs': lot.restants.astype(np.int16),
+                'mobilité': np.empty((nombre, 2), dtype=np.int16)}
+    if chemins:
+        résultat['chemins'] = np.empty((nombre, 2), dtype=np.int32)
+    for début in range(0, nombre, taille_bloc):
+        tranche = slice(début, début + taille_bloc)
+        passages = ouvertures(lot.murs[tranche])
+        pions = lot.pions[tranche]
+        taille = len(pions)
+        # Un seul parcours pour les deux joueurs: le bloc est dédoublé.
+        rangées, colonnes = np.divmod(pions.T.reshape(-1).astype(np.int64), 9)
+        distances, nombres = parcours(
+            [np.concatenate((passage, passage), axis=2) for passage in passages],
+            np.repeat(ARRIVÉES, taille), rangées, colonnes, chemins)
+        résultat['distances'][tranche] = distances.reshape(2, taille).T
+        if chemins:
+            résultat['chemins'][tranche] = nombres.reshape(2, taille).T
+        résultat['mobilité'][tranche] = mobilités(passages, pions)
+    return résultat
@@ -0,0 +1,237 @@
+""" module finale
+
+Résolution exacte des finales. Quand plus personne n'a de mur, le plateau
+ne change plus: une analyse rétrograde sur tous les triplets (case 1, case
+2, joueur au trait) donne, pour chaque position, le gagnant et le nombre de
+coups avec le meilleur jeu des deux côtés. Une table est calculée une fois
+par configuration de murs et gardée en cache.
+
+Quand un seul joueur a encore des murs, une recherche exhaustive de
+profondeur bornée s'appuie sur ces tables: elle conclut si elle trouve un
+gain ou une perte forcés avant la borne.
+"""
+
+import array
+import collections
+import threading
+
+from plateau import LIGNE_1, LIGNE_9, NB_CASES, Plateau, bits
+
+NULLE, GAIN, PERTE = 0, 1, 2
+
+
+def _indice(pion1, pion2, trait):
+    return (pion1 * NB_CASES + pion2) * 2 + trait
+
+
+class TableFinale:
+    """
+    Valeur exacte de toutes les courses sur un plateau sans murs à poser
+
+    résultat[i] vaut GAIN, PERTE (pour le joueur au trait) ou NULLE si
+    aucun des deux ne peut forcer l'arrivée; plis[i] est le nombre de
+    coups avant l'arrivée avec le meilleur jeu.
+    """
+    def __init__(self, plateau):
+        self.plateau = plateau
+        self.pas = [list(bits(plateau.voisins(1 << pion))) for pion in range(NB_CASES)]
+        taille = NB_CASES * NB_CASES * 2
+        self.résultat = bytearray(taille)
+        self.plis = array.array('H', bytes(2 * taille))
+        prédécesseurs = [[] for _ in range(taille)]
+        restants = array.array('H', bytes(2 * taille))
+        file = collections.deque()
+        for pion1 in range(NB_CASES):
+            arrivé1 = (1 << pion1) & LIGNE_9
+            for pion2 in range(NB_CASES):
+                if pion1 == pion2:
+                    continue
+                indice = (pion1 * NB_CASES + pion2) * 2
+                if arrivé1 or (1 << pion2) & LIGNE_1:
+                    gagnant = 0 if arrivé1 else 1
+                    self.résultat[indice] = PERTE if gagnant else GAIN
+                    self.résultat[indice + 1] = GAIN if gagnant else PERTE
+                    file.append(indice)
+                    file.append(indice + 1)
+                    continue
+                # Indices calculés sur place: cette boucle fait tout le coût de la table.
+                cibles = self.cibles(pion1, pion2)
+                restants[indice] = len(cibles)
+                for cible in cibles:
+                    prédécesseurs[(cible * NB_CASES + pion2) * 2 + 1].append(indice)
+                cibles = self.cibles(pion2, pion1)
+                restants[indice + 1] = len(cibles)
+                for cible in cibles:
+                    prédécesseurs[(pion1 * NB_CASES + cible) * 2].append(indice + 1)
+        while file:
+            indice = file.popleft()
+            perdu = self.résultat[indice] == PERTE
+            for précédent in prédécesseurs[indice]:
+                if self.résultat[précédent]:
+                    continue
+                if perdu:
+                    self.résultat[précédent] = GAIN
+                else:
+                    restants[précédent] -= 1
+                    if restants[précédent]:
+                        continue
+                    self.résultat[précédent] = PERTE
+                self.plis[précédent] = self.plis[indice] + 1
+                file.append(précédent)
+
+    def cibles(self, pion, autre):
+        """Cases où le pion peut aller (plateau.coups_pion, sans masque)."""
+        pas = self.pas[pion]
+        if autre in pas:
+            return list(bits(self.plateau.coups_pion(pion, autre)))
+        return pas
+
+    def suivants(self, pion1, pion2, trait):
+        """Indices des positions atteintes par un coup du joueur au trait."""
+        if trait == 0:
+            return [_indice(cible, pion2, 1) for cible in self.cibles(pion1, pion2)]
+        return [_indice(pion1, cible, 0) for cible in self.cibles(pion2, pion1)]
+
+    def valeur(self, pion1, pion2, trait):
+        """(GAIN, PERTE ou NULLE pour le joueur au trait, nombre de coups restants)."""
+        indice = _indice(pion1, pion2, trait)
+        return self.résultat[indice], self.plis[indice]
+
+    def meilleur_coup(self, pion1, pion2, trait):
+        """Case où aller: le gain le plus court, la perte la plus longue ou une nulle."""
+        pions = (pion1, pion2)
+        meilleur = None
+        for cible in self.cibles(pions[trait], pions[1 - trait]):
+            suivant = (cible, pion2, 1) if trait == 0 else (pion1, cible, 0)
+            résultat, plis = self.valeur(*suivant)
+            # Du point de vue du joueur au trait: une perte de l'adversaire
+            # d'abord (la plus rapide), puis une nulle, puis le gain adverse le
+            # plus lent.
+            rang = {PERTE: (0, plis), NULLE: (1, 0), GAIN: (2, -plis)}[résultat]
+            if meilleur is None or rang < meilleur[0]:
+                meilleur = (rang, cible)
+        return None if meilleur is None else meilleur[1]
+
+
+_TABLES = collections.OrderedDict()
+# Les fils du serveur (serveur.py) partagent les tables, comme plateau.CACHE.
+_VERROU_TABLES = threading.Lock()
+CAPACITÉ_TABLES = 64
+
+
+def table(murs, calculer=True):
+    """Table de la configuration de murs donnée (masque des emplacements).
+
+    Les tables les moins récemment utilisées sont évincées au-delà de
+    CAPACITÉ_TABLES. Sans calculer, retourne None si la table n'existe pas.
+    La table est construite hors du verrou; si un autre fil l'a construite
+    entre-temps, c'est la sienne qui est gardée.
+    """
+    with _VERROU_TABLES:
+        résultat = _TABLES.get(murs)
+        if résultat is not None:
+            _TABLES.move_to_end(murs)
+            return résultat
+    if not calculer:
+        return None
+    nouvelle = TableFinale(Plateau.depuis_murs(murs))
+    with _VERROU_TABLES:
+        résultat = _TABLES.setdefault(murs, nouvelle)
+        _TABLES.move_to_end(murs)
+        if len(_TABLES) > CAPACITÉ_TABLES:
+            _TABLES.popitem(last=False)
+    return résultat
+
+
+class Solveur:
+    """
+    Recherche exhaustive bornée quand un seul joueur a encore des murs
+
+    Tous les coups légaux sont essayés, les déplacements d'abord; les
+    positions sans murs à poser sont évaluées par table. Au-delà de
+    profondeur coups, de noeuds_max noeuds ou de tables_max nouvelles
+    tables, la position est déclarée inconnue (None). Une table coûte
+    quelques dizaines de millisecondes: par défaut, seules celles déjà en
+    cache servent, pour que le coup reste instantané.
+    """
+    def __init__(self, profondeur=3, noeuds_max=200, tables_max=0):
+        self.profondeur = profondeur
+        self.noeuds_max = noeuds_max
+        self.tables_max = tables_max
+        self.noeuds = 0
+        self.tables = 0
+        self.limite = False
+
+    def résoudre(self, position, profondeur):
+        """(GAIN ou PERTE pour le joueur au trait, plis) ou None si la borne est atteinte."""
+        self.noeuds += 1
+        gagnant = position.gagnant()
+        if gagnant is not None:
+            return (GAIN if gagnant == position.trait else PERTE), 0
+        if not any(position.murs):
+            courante = table(position.plateau.murs, calculer=False)
+            if courante is None:
+                if self.tables >= self.tables_max:
+                    self.limite = True
+                    return None
+                self.tables += 1
+                courante = table(position.plateau.murs)
+            résultat, plis = courante.valeur(*position.pions, position.trait)
+            return None if résultat == NULLE else (résultat, plis)
+        if self.noeuds > self.noeuds_max:
+            self.limite = True
+            return None
+        if profondeur == 0:
+            return None
+        gain = None
+        pertes = []
+        inconnu = False
+        for code in position.coups_légaux():
+            position.appliquer(code)
+            try:
+                suite = self.résoudre(position, profondeur - 1)
+            finally:
+                position.annuler(code)
+            if suite is None:
+                inconnu = True
+            elif suite[0] == PERTE:
+                if gain is None or suite[1] + 1 < gain[1]:
+                    gain = (GAIN, suite[1] + 1, code)
+                if suite[1] == 0:
+                    break
+            else:
+                pertes.append((suite[1] + 1, code))
+        if gain is not None:
+            return gain
+        if inconnu or not pertes:
+            return None
+        plis, code = max(pertes)
+        return PERTE, plis, code
+
+    def meilleur_coup(self, position):
+        """Code d'un coup prouvé optimal dans la borne, ou None."""
+        self.tables = 0
+        self.limite = False
+        for profondeur in range(1, self.profondeur + 1):
+            self.noeuds = 0
+            résultat = self.résoudre(position, profondeur)
+            if résultat is not None and len(résultat) == 3:
+                return résultat[2]
+            if self.limite:
+                break
+        return None
+
+
+def coup_finale(position, profondeur=3, noeuds_max=200):
+    """Code du coup exact pour le joueur au trait, ou None si la finale n'est pas résolue.
+
+    Sans murs des deux côtés, la réponse vient de la table. Avec des murs
+    d'un seul côté, du Solveur borné.
+    """
+    if not any(position.murs):
+        pions = position.pions
+        return table(position.plateau.murs).meilleur_coup(pions[0], pions[1], position.trait)
+    if all(position.murs):
+        return None
+    return Solveur(profondeur, noeuds_max).meilleur_coup(position)
+
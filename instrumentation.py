@@ -0,0 +1,149 @@
+""" module instrumentation
+
+Compteurs et chronomètres facultatifs du moteur: graphes construits,
+parcours en largeur, murs essayés et refusés, succès du cache, durée des
+méthodes de Quoridor. Tant que INSTRUMENTS.actif est faux, chaque point de
+mesure ne coûte qu'un test d'attribut, et les méthodes chronométrées (mesuré)
+sont les fonctions d'origine: activer installe leurs chronomètres.
+
+    INSTRUMENTS.activer()
+    INSTRUMENTS.abonner('murs_refusés', lambda nom, valeur: print(nom, valeur))
+    ...
+    INSTRUMENTS.écrire_profil('partie.json')
+"""
+
+import collections
+import functools
+import json
+import sys
+import time
+
+
+class Instruments:
+    """
+    Registre des compteurs et des durées, avec abonnements par événement
+
+    Un abonné reçoit (nom, valeur): le nombre ajouté pour un compteur, la
+    durée en secondes pour un chronomètre. Il s'abonne à '*' pour tout recevoir.
+    """
+    def __init__(self):
+        self.actif = False
+        self.compteurs = collections.Counter()
+        self.durées = {}
+        self.étapes = []
+        self.abonnés = {}
+        self._repère = (collections.Counter(), {})
+
+    def activer(self):
+        """Active les mesures et installe les chronomètres des fonctions mesurées."""
+        self.actif = True
+        _installer(True)
+
+    def désactiver(self):
+        """Désactive les mesures, sans effacer celles déjà prises."""
+        self.actif = False
+        _installer(False)
+
+    def vider(self):
+        """Efface les mesures et les étapes (les abonnements restent)."""
+        self.compteurs.clear()
+        self.durées.clear()
+        self.étapes.clear()
+        self._repère = (collections.Counter(), {})
+
+    def abonner(self, nom, fonction):
+        """Appelle fonction(nom, valeur) à chaque mesure de nom ('*' pour toutes)."""
+        self.abonnés.setdefault(nom, []).append(fonction)
+
+    def désabonner(self, nom, fonction):
+        """Retire un abonnement fait par abonner."""
+        self.abonnés[nom].remove(fonction)
+
+    def _notifier(self, nom, valeur):
+        for fonction in self.abonnés.get(nom, ()):
+            fonction(nom, valeur)
+        for fonction in self.abonnés.get('*', ()):
+            fonction(nom, valeur)
+
+    def compter(self, nom, nombre=1):
+        """Ajoute nombre au compteur nom."""
+        self.compteurs[nom] += nombre
+        if self.abonnés:
+            self._notifier(nom, nombre)
+
+    def chronométrer(self, nom, durée):
+        """Ajoute un appel de durée secondes au chronomètre nom."""
+        cumul = self.durées.get(nom)
+        if cumul is None:
+            self.durées[nom] = [durée, 1]
+        else:
+            cumul[0] += durée
+            cumul[1] += 1
+        if self.abonnés:
+            self._notifier(nom, durée)
+
+    def marquer(self, étiquette):
+        """Ferme une étape (un coup, par exemple) avec les mesures prises depuis la précédente."""
+        compteurs, durées = self._repère
+        self.étapes.append({
+            'étape': étiquette,
+            'compteurs': dict(self.compteurs - compteurs),
+            'durées': {nom: cumul[0] - durées.get(nom, (0.0, 0))[0]
+                       for nom, cumul in self.durées.items()
+                       if cumul[1] != durées.get(nom, (0.0, 0))[1]}})
+        self._repère = (collections.Counter(self.compteurs),
+                        {nom: tuple(cumul) for nom, cumul in self.durées.items()})
+
+    def profil(self):
+        """Compteurs, durées (total, appels, moyenne) et étapes."""
+        return {'compteurs': dict(self.compteurs),
+                'durées': {nom: {'total': total, 'appels': appels, 'moyenne': total / appels}
+                           for nom, (total, appels) in self.durées.items()},
+                'étapes': list(self.étapes)}
+
+    def écrire_profil(self, chemin, **infos):
+        """Écrit le profil en JSON, avec les informations supplémentaires infos."""
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            json.dump(dict(infos, **self.profil()), fichier, indent=1, ensure_ascii=False)
+
+
+INSTRUMENTS = Instruments()
+
+
+# (fonction d'origine, fonction chronométrée) de chaque fonction mesurée.
+_MESURÉES = []
+
+
+def _installer(chronométrer):
+    """Met en place la version chronométrée ou d'origine de chaque fonction mesurée."""
+    for fonction, enveloppe in _MESURÉES:
+        # Classe (ou module) qui porte la fonction, d'après son nom qualifié.
+        *chemin, attribut = fonction.__qualname__.split('.')
+        porteur = sys.modules.get(fonction.__module__)
+        for nom in chemin:
+            porteur = getattr(porteur, nom, None)
+        if porteur is not None:
+            setattr(porteur, attribut, enveloppe if chronométrer else fonction)
+
+
+def mesuré(nom):
+    """Décorateur: chronomètre la fonction et compte ses exceptions (nom.erreurs).
+
+    La fonction d'origine est retournée telle quelle tant que les
+    instruments sont inactifs: aucun surcoût. INSTRUMENTS.activer la
+    remplace par sa version chronométrée, désactiver la remet en place.
+    """
+    def décorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            début = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            except Exception:
+                INSTRUMENTS.compter(nom + '.erreurs')
+                raise
+            finally:
+                INSTRUMENTS.chronométrer(nom, time.perf_counter() - début)
+        _MESURÉES.append((fonction, enveloppe))
+        return enveloppe if INSTRUMENTS.actif else fonction
+    return décorateur
@@ -0,0 +1,175 @@
+"""Quoridor - module livre
+
+Livre d'ouvertures: pour chaque position des premiers coups de parties
+enregistrées (module enregistrement), les coups joués avec leur nombre de
+parties et de victoires. Les positions symétriques (gauche-droite, et
+haut-bas avec les joueurs échangés) partagent une entrée: la clé est la
+clé canonique de l'état, et le coup est celui de la position canonique.
+Le fichier est une suite d'enregistrements de taille fixe triés par (clé,
+coup), lue par mmap et recherche dichotomique: rien à décoder au
+chargement, et les processus qui l'ouvrent partagent les mêmes pages.
+
+    python livre.py parties.qrd -o livre.bin --plis 12
+    python livre.py --jouer 500 --stratégie heuristique -o livre.bin
+"""
+
+import argparse
+import collections
+import itertools
+import mmap
+import os
+import struct
+import tempfile
+
+from enregistrement import ÉcrivainParties, lire_parties
+from etat import EtatJeu
+from plateau import Plateau, case, symétrie_coup
+
+MAGIQUE = b'QLV2'
+# clé canonique de la position (EtatJeu.clé_canonique), code du coup, parties, victoires du joueur au trait
+ENREGISTREMENT = struct.Struct('<QBII')
+
+
+def position_initiale():
+    """EtatJeu du début de partie, joueur 1 au trait."""
+    return EtatJeu(Plateau(), [case((5, 1)), case((5, 9))], [10, 10])
+
+
+def statistiques(parties, plis=12):
+    """{(clé, code): [parties, victoires]} des plis premiers coups des parties."""
+    compte = collections.defaultdict(lambda: [0, 0])
+    for partie in parties:
+        position = position_initiale()
+        for code in partie.coups[:plis]:
+            clé, symétrie = position.clé_canonique()
+            entrée = compte[(clé, symétrie_coup(code, symétrie))]
+            entrée[0] += 1
+            if partie.gagnant == position.trait + 1:
+                entrée[1] += 1
+            position.appliquer(code)
+    return compte
+
+
+def écrire_livre(chemin, compte, minimum=1):
+    """Écrit les entrées vues au moins minimum fois, triées par (clé, coup)."""
+    with open(chemin, 'wb') as fichier:
+        fichier.write(MAGIQUE)
+        for (clé, code), (total, victoires) in sorted(compte.items()):
+            if total >= minimum:
+                fichier.write(ENREGISTREMENT.pack(clé, code, total, victoires))
+
+
+class Livre:
+    """
+    Livre d'ouvertures projeté en mémoire
+
+    coups(clé) donne les statistiques d'une position canonique en O(log n)
+    lectures; coup(position) le coup à jouer dans une position quelconque.
+    """
+    def __init__(self, chemin):
+        self._fichier = open(chemin, 'rb')
+        if os.fstat(self._fichier.fileno()).st_size <= len(MAGIQUE):
+            self.données = b''
+        else:
+            self.données = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.données and self.données[:len(MAGIQUE)] != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un livre d'ouvertures")
+        self.taille = max(0, len(self.données) - len(MAGIQUE)) // ENREGISTREMENT.size
+
+    def __len__(self):
+        return self.taille
+
+    def _clé(self, indice):
+        return struct.unpack_from('<Q', self.données,
+                                  len(MAGIQUE) + indice * ENREGISTREMENT.size)[0]
+
+    def coups(self, clé):
+        """Liste des (code, parties, victoires) de la position de clé donnée."""
+        bas, haut = 0, self.taille
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._clé(milieu) < clé:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        résultat = []
+        while bas < self.taille:
+            clé_lue, code, total, victoires = ENREGISTREMENT.unpack_from(
+                self.données, len(MAGIQUE) + bas * ENREGISTREMENT.size)
+            if clé_lue != clé:
+                break
+            résultat.append((code, total, victoires))
+            bas += 1
+        return résultat
+
+    def meilleur(self, clé, minimum=2):
+        """Code du coup au meilleur taux de victoire parmi ceux joués minimum fois, ou None."""
+        candidats = [(victoires / total, total, code)
+                     for code, total, victoires in self.coups(clé) if total >= minimum]
+        return max(candidats)[2] if candidats else None
+
+    def coup(self, position, minimum=2):
+        """Code du meilleur coup (voir meilleur) pour le joueur au trait de l'EtatJeu, ou None."""
+        clé, symétrie = position.clé_canonique()
+        code = self.meilleur(clé, minimum)
+        return None if code is None else symétrie_coup(code, symétrie)
+
+    def fermer(self):
+        """Libère la projection et le fichier."""
+        if isinstance(self.données, mmap.mmap):
+            self.données.close()
+        self._fichier.close()
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Construction du livre d'ouvertures")
+
+    parser.add_argument("parties", nargs="*", help="Fichiers de parties (module enregistrement)")
+
+    parser.add_argument("-o", "--sortie", default="livre.bin", help="Fichier du livre")
+
+    parser.add_argument("--plis", type=int, default=12,
+                        help="Nombre de coups retenus au début de chaque partie")
+
+    parser.add_argument("--minimum", type=int, default=2,
+                        help="Nombre minimal de parties pour garder un coup")
+
+    parser.add_argument("--jouer", type=int, default=0,
+                        help="Nombre de parties à jouer contre soi-même en plus des fichiers")
+
+    parser.add_argument("--stratégie", default="heuristique",
+                        help="Stratégie des parties jouées (voir tournoi); elle doit varier "
+                             "d'une partie à l'autre")
+
+    parser.add_argument("-p", "--processus", type=int, default=None,
+                        help="Nombre de processus pour les parties jouées")
+
+    return parser.parse_args()
+
+
+def main():
+    """Construit le livre à partir des fichiers et des parties jouées."""
+    args = analyser_commande()
+    chemins = list(args.parties)
+    dossier = None
+    if args.jouer:
+        from tournoi import tournoi
+        dossier = tempfile.TemporaryDirectory()
+        chemin = os.path.join(dossier.name, 'parties.qrd')
+        with ÉcrivainParties(chemin, index=False) as enregistrement, \
+                open(os.devnull, 'w', encoding='utf-8') as nulle:
+            tournoi(args.stratégie, args.stratégie, args.jouer, nulle, args.processus,
+                    enregistrement=enregistrement)
+        chemins.append(chemin)
+    parties = itertools.chain.from_iterable(lire_parties(chemin) for chemin in chemins)
+    compte = statistiques(parties, args.plis)
+    écrire_livre(args.sortie, compte, args.minimum)
+    if dossier is not None:
+        dossier.cleanup()
+    print(f"{args.sortie}: {sum(1 for entrée in compte.values() if entrée[0] >= args.minimum)} "
+          f"coups, {len({clé for clé, _ in compte})} positions vues")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,11 @@
 #pylint:disable=E1101
 
 import argparse
-import turtle
 
 import api
-from quoridor import Quoridor
-from quoridorx import QuoridorX
+
+# Le moteur, turtle et quoridorx ne sont importés que par les modes qui
+# s'en servent: -l se contente d'api.
 
 
 def analyser_commande():
@@ -22,49 +22,90 @@ def analyser_commande():
     parser.add_argument("-x", dest="mode_graphique", action="store_true",
                         help="Jouer contre le serveur avec affichage graphique")
 
+    parser.add_argument("-t", "--temps", dest="temps", type=float, default=0.5,
+                        help="Temps de réflexion maximal par coup en mode automatique (s)")
+
+    parser.add_argument("-p", "--anticiper", dest="anticiper", action="store_true",
+                        help="Réfléchir pendant le tour de l'adversaire en mode automatique")
+
+    parser.add_argument("--livre", dest="livre", default=None,
+                        help="Livre d'ouvertures (module livre) en mode automatique")
+
+    parser.add_argument("--url", dest="url", default=None,
+                        help="Adresse de base du serveur (par défaut $QUORIDOR_URL ou celle du cours)")
+
     parser.add_argument("idul", help="IDUL du joueur")
 
     return parser.parse_args()
 
 
-def jouer_coup(args, q, id_partie):
+def jouer_coup(args, q, id_partie, anticipation=None):
     """Boucle de saisie."""
     if args.mode_auto:
-        return api.jouer_coup(id_partie, q.type_coup.upper(), q.pos_coup)
+        # Le coup anticipé passe après le livre et la finale; assez cherché,
+        # il est joué tout de suite, sinon la recherche le reprend.
+        prévu = anticipation.réplique(q.état) if anticipation else None
+        type_coup, x, y = q.jouer_coup(1, temps_max=args.temps, prévu=prévu)
+        recherche = q.dernière_recherche
+        if recherche is None:
+            print(f"{type_coup} {x} {y} (livre ou finale)")
+        else:
+            print(f"{type_coup} {x} {y} (profondeur {recherche['profondeur']}"
+                  f"{', anticipé' if recherche['anticipé'] else ''}, "
+                  f"{recherche['noeuds']} noeuds, {recherche['temps']:.2f} s)")
+        if anticipation:
+            anticipation.démarrer(q.état)
+        return api.jouer_coup(id_partie, type_coup, (x, y))
+
+    if args.mode_graphique:
+        choix = q.demander_coup()
+        if choix is None:
+            raise RuntimeError("Fenêtre fermée par le joueur")
+        return api.jouer_coup(id_partie, *choix)
 
     capture = None
-    titre = "C'est votre tour!"
     question = "Entrez votre prochain coup sous la forme (D|MH|MV) x y :"
 
     while not capture:
-        if args.mode_graphique:
-            entree = turtle.textinput(titre, question)
-            if entree is None:
-                turtle.mainloop()
-                raise RuntimeError("Fenêtre fermée par le joueur")
-        else:
-            print(question, end=" ")
-            entree = input()
+        print(question, end=" ")
+        entree = input()
+
+
+def classe_jeu(args):
+    """Quoridor, ou QuoridorX (turtle) en mode graphique."""
+    if args.mode_graphique:
+        from quoridorx import QuoridorX
+        return QuoridorX
+    from quoridor import Quoridor
+    return Quoridor
 
 
 def main():
     """Boucle principale."""
     args = analyser_commande()
+    if args.url:
+        api.CLIENT = api.ClientQuoridor(args.url)
 
     if args.lister:
         for partie in api.lister_parties(args.idul):
             print(partie["id"])
         return
 
+    jeu = classe_jeu(args)
+    if args.livre:
+        from livre import Livre
+        jeu.livre = Livre(args.livre)
+    anticipation = None
+    if args.mode_auto and args.anticiper:
+        from anticipation import Anticipation
+        anticipation = Anticipation()
+
     id_partie, partie = api.débuter_partie(args.idul)
     gagnant = False
     q = None
 
     while not gagnant:
-        if args.mode_graphique:
-            q = QuoridorX(partie["joueurs"], partie["murs"])
-        else:
-            q = Quoridor(partie["joueurs"], partie["murs"])
+        q = jeu(partie["joueurs"], partie["murs"])
 
         gagnant = q.partie_terminée()
         if gagnant:
@@ -75,12 +116,19 @@ def main():
         else:
             print("", q, sep="\n")
 
-        partie = jouer_coup(args, q, id_partie)
+        partie = jouer_coup(args, q, id_partie, anticipation)
+
+    if anticipation:
+        anticipation.arrêter()
 
     if args.mode_graphique:
+        import turtle
         turtle.mainloop()
     else:
         print("", q, "", f'{gagnant} a gagné la partie!', "", sep="\n")
+        for chemin, stats in api.CLIENT.statistiques().items():
+            print(f"{chemin}: {stats['requêtes']} requêtes, moyenne {stats['moyenne']:.3f} s, "
+                  f"max {stats['max']:.3f} s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+""" module mcts
+
+Recherche arborescente Monte-Carlo (UCT) parallélisée à la racine: chaque
+processus construit son propre arbre à partir de la forme compacte d'un
+EtatJeu, puis le processus parent additionne les visites des coups de la
+racine.
+"""
+
+import concurrent.futures
+import math
+import os
+import random
+import time
+
+from etat import EtatJeu
+from plateau import MUR, OBJECTIFS, bits
+from recherche import Recherche
+
+EXPLORATION = 1.4
+PROFONDEUR_SIMULATION = 24
+PROBABILITÉ_MUR = 0.2
+
+_EXÉCUTEURS = {}
+
+
+class _Noeud:
+    """
+    Noeud de l'arbre UCT; gains est compté pour le joueur qui a joué coup
+    """
+    __slots__ = ('coup', 'parent', 'joueur', 'à_essayer', 'enfants', 'visites', 'gains')
+
+    def __init__(self, coup, parent, joueur, à_essayer):
+        self.coup = coup
+        self.parent = parent
+        self.joueur = joueur
+        self.à_essayer = à_essayer
+        self.enfants = []
+        self.visites = 0
+        self.gains = 0
+
+    def choisir(self):
+        """Enfant qui maximise la borne UCB1."""
+        log_visites = math.log(self.visites)
+        return max(self.enfants,
+                   key=lambda enfant: (enfant.gains / enfant.visites +
+                                       EXPLORATION * math.sqrt(log_visites / enfant.visites)))
+
+
+def _favori(position):
+    """Joueur qui gagne la course si plus personne ne pose de mur."""
+    joueur = position.trait
+    adversaire = 1 - joueur
+    pions = position.pions
+    # Un pion bloqué un moment par l'autre compte sa distance sans les pions.
+    dist_joueur = position.plateau.distance_course(pions[joueur], pions[adversaire],
+                                                   OBJECTIFS[joueur])
+    dist_adversaire = position.plateau.distance_course(pions[adversaire], pions[joueur],
+                                                       OBJECTIFS[adversaire])
+    return joueur if dist_joueur <= dist_adversaire else adversaire
+
+
+def _coup_simulation(position, hasard):
+    """Coup de la politique de simulation: un pas vers l'objectif, parfois un mur."""
+    joueur = position.trait
+    adversaire = 1 - joueur
+    plateau = position.plateau
+    pions = position.pions
+    if position.murs[joueur] and hasard.random() < PROBABILITÉ_MUR:
+        murs = [code for code in Recherche(largeur_murs=4).coups(position) if code >= MUR]
+        if murs:
+            return hasard.choice(murs)
+    pas, _ = plateau.premiers_pas(pions[joueur], pions[adversaire], OBJECTIFS[joueur])
+    if not pas:
+        # Bloqué par l'autre pion: n'importe quel déplacement permis.
+        return hasard.choice(list(bits(plateau.coups_pion(pions[joueur], pions[adversaire]))))
+    meilleure = min(pas)[0]
+    return hasard.choice([cible for distance, cible in pas if distance == meilleure])
+
+
+def simuler(position, hasard, profondeur=PROFONDEUR_SIMULATION):
+    """Joue une partie rapide et retourne l'indice du gagnant.
+
+    Après profondeur coups, le gagnant est celui qui mène la course. La
+    position est remise dans son état de départ.
+    """
+    joués = []
+    gagnant = position.gagnant()
+    while gagnant is None and len(joués) < profondeur:
+        code = _coup_simulation(position, hasard)
+        position.appliquer(code)
+        joués.append(code)
+        gagnant = position.gagnant()
+    if gagnant is None:
+        gagnant = _favori(position)
+    for code in reversed(joués):
+        position.annuler(code)
+    return gagnant
+
+
+def explorer(état, temps_max, graine, largeur_murs=8):
+    """Construit un arbre UCT pendant temps_max secondes.
+
+    Retourne {code du coup: (visites, gains)} pour les coups de la racine.
+    """
+    hasard = random.Random(graine)
+    position = EtatJeu.depuis_compact(état)
+    générateur = Recherche(largeur_murs=largeur_murs)
+    racine = _Noeud(None, None, 1 - position.trait, générateur.coups(position))
+    échéance = time.perf_counter() + temps_max
+    while time.perf_counter() < échéance:
+        noeud = racine
+        joués = []
+        while not noeud.à_essayer and noeud.enfants:
+            noeud = noeud.choisir()
+            position.appliquer(noeud.coup)
+            joués.append(noeud.coup)
+        if noeud.à_essayer and position.gagnant() is None:
+            code = noeud.à_essayer.pop(0)
+            joueur = position.trait
+            position.appliquer(code)
+            joués.append(code)
+            à_essayer = générateur.coups(position) if position.gagnant() is None else []
+            enfant = _Noeud(code, noeud, joueur, à_essayer)
+            noeud.enfants.append(enfant)
+            noeud = enfant
+        gagnant = simuler(position, hasard)
+        for code in reversed(joués):
+            position.annuler(code)
+        while noeud is not None:
+            noeud.visites += 1
+            if gagnant == noeud.joueur:
+                noeud.gains += 1
+            noeud = noeud.parent
+    return {enfant.coup: (enfant.visites, enfant.gains) for enfant in racine.enfants}
+
+
+def _exécuteur(processus):
+    """Réserve de processus réutilisée d'un appel à l'autre."""
+    if processus not in _EXÉCUTEURS:
+        _EXÉCUTEURS[processus] = concurrent.futures.ProcessPoolExecutor(processus)
+    return _EXÉCUTEURS[processus]
+
+
+def chercher(état, temps_max=1.0, processus=None, graine=None):
+    """Meilleur coup (code) pour le joueur au trait d'un état (EtatJeu.compact).
+
+    Lance un arbre indépendant par processus (tous les coeurs par défaut)
+    et choisit le coup le plus visité au total. Retourne (code, statistiques).
+    """
+    processus = processus or os.cpu_count() or 1
+    hasard = random.Random(graine)
+    graines = [hasard.getrandbits(32) for _ in range(processus)]
+    début = time.perf_counter()
+    if processus == 1:
+        résultats = [explorer(état, temps_max, graines[0])]
+    else:
+        résultats = list(_exécuteur(processus).map(
+            explorer, [état] * processus, [temps_max] * processus, graines))
+    total = {}
+    for résultat in résultats:
+        for code, (visites, gains) in résultat.items():
+            cumul = total.get(code, (0, 0))
+            total[code] = (cumul[0] + visites, cumul[1] + gains)
+    if total:
+        meilleur = max(total, key=lambda code: total[code][0])
+    else:
+        meilleur = Recherche().coups(EtatJeu.depuis_compact(état))[0]
+    statistiques = {'simulations': sum(visites for visites, _ in total.values()),
+                    'processus': processus,
+                    'temps': time.perf_counter() - début}
+    return meilleur, statistiques
@@ -0,0 +1,118 @@
+"""Quoridor - module parties
+
+Mène plusieurs parties contre le serveur en même temps. Les requêtes
+passent par api_async; le choix des coups, qui occupe le processeur, est
+confié à une réserve de processus pour ne pas bloquer la boucle asyncio.
+
+    python parties.py idul -n 24 -t 0.5
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import time
+
+from api import URL_BASE
+from api_async import ClientQuoridorAsync
+from quoridor import Quoridor
+
+
+def choisir_coup(état, temps_max):
+    """Coup (type, x, y) du joueur 1 pour l'état reçu du serveur."""
+    return Quoridor(état["joueurs"], état["murs"]).jouer_coup(1, temps_max=temps_max)
+
+
+async def jouer_partie(client, idul, exécuteur, temps_max):
+    """Joue une partie complète et retourne (id, gagnant, coups joués, erreur).
+
+    Le gagnant vient de l'état de la partie (partie_terminée). Une erreur
+    du serveur, du réseau ou du moteur interrompt cette partie seulement:
+    le gagnant est alors None et erreur son message (None sinon).
+    """
+    boucle = asyncio.get_running_loop()
+    id_partie = None
+    coups = 0
+    try:
+        id_partie, état = await client.débuter_partie(idul)
+        while True:
+            q = Quoridor(état["joueurs"], état["murs"])
+            gagnant = q.partie_terminée()
+            if gagnant:
+                return id_partie, gagnant, coups, None
+            coup = await boucle.run_in_executor(exécuteur, choisir_coup, état, temps_max)
+            coups += 1
+            q.jouer(1, coup)
+            try:
+                état = await client.jouer_coup(id_partie, coup[0], coup[1:])
+            except RuntimeError:
+                # Le serveur du cours annonce la fin de la partie par un message.
+                gagnant = q.partie_terminée()
+                if gagnant:
+                    return id_partie, gagnant, coups, None
+                raise
+    except Exception as erreur:  # pylint: disable=broad-except
+        # Les autres parties de jouer_parties continuent.
+        return id_partie, None, coups, f"{type(erreur).__name__}: {erreur}"
+
+
+async def jouer_parties(idul, parties, temps_max=0.5, simultanées=None, processus=None,
+                        url_base=URL_BASE):
+    """Joue parties parties, au plus simultanées à la fois (toutes par défaut).
+
+    Retourne la liste des résultats de jouer_partie, la durée totale (s)
+    et les latences du client: {point d'accès: [durée de chaque requête (s)]}.
+    """
+    limite = asyncio.Semaphore(simultanées or parties)
+    début = time.perf_counter()
+
+    with concurrent.futures.ProcessPoolExecutor(processus) as exécuteur:
+        async with ClientQuoridorAsync(url_base) as client:
+
+            async def une_partie():
+                async with limite:
+                    return await jouer_partie(client, idul, exécuteur, temps_max)
+
+            résultats = await asyncio.gather(*(une_partie() for _ in range(parties)))
+            latences = client.latences
+
+    return résultats, time.perf_counter() - début, latences
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Parties Quoridor simultanées contre le serveur")
+
+    parser.add_argument("idul", help="IDUL du joueur")
+
+    parser.add_argument("-n", "--parties", type=int, default=10, help="Nombre de parties")
+
+    parser.add_argument("-s", "--simultanées", type=int, default=None,
+                        help="Nombre maximal de parties en cours à la fois")
+
+    parser.add_argument("-p", "--processus", type=int, default=None,
+                        help="Nombre de processus pour le choix des coups")
+
+    parser.add_argument("-t", "--temps", type=float, default=0.5,
+                        help="Temps de réflexion maximal par coup (s)")
+
+    parser.add_argument("--url", default=URL_BASE, help="Adresse de base du serveur")
+
+    return parser.parse_args()
+
+
+def main():
+    """Lance les parties et affiche leurs résultats."""
+    args = analyser_commande()
+    résultats, durée, latences = asyncio.run(jouer_parties(
+        args.idul, args.parties, args.temps, args.simultanées, args.processus, args.url))
+    for id_partie, gagnant, coups, erreur in résultats:
+        if erreur is None:
+            print(f"{id_partie}: {gagnant} ({coups} coups)")
+        else:
+            print(f"{id_partie}: erreur après {coups} coups: {erreur}")
+    requêtes = sum(len(durées) for durées in latences.values())
+    print(f"{len(résultats)} parties en {durée:.1f} s, {requêtes / durée:.1f} requêtes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,611 @@
+""" module plateau
+
+Moteur de plateau compact. Chaque case (x, y) est le bit (x - 1) + 9*(y - 1)
+d'un entier et les arêtes coupées par les murs sont conservées dans quatre
+masques, un par direction. Les parcours en largeur se font par décalages de
+bits, sans construire de graphe.
+"""
+
+import collections
+import threading
+
+from instrumentation import INSTRUMENTS
+
+TAILLE = 9
+NB_CASES = TAILLE * TAILLE
+PLEIN = (1 << NB_CASES) - 1
+LIGNE_1 = (1 << TAILLE) - 1
+LIGNE_9 = LIGNE_1 << (TAILLE * (TAILLE - 1))
+COLONNE_1 = sum(1 << (TAILLE * rangée) for rangée in range(TAILLE))
+COLONNE_9 = COLONNE_1 << (TAILLE - 1)
+# Rangée d'arrivée de chaque joueur ('B1' et 'B2' dans construire_graphe)
+OBJECTIFS = (LIGNE_9, LIGNE_1)
+NB_EMPLACEMENTS = 128
+# Un coup tient dans un octet: case d'arrivée du pion (0 à 80) ou
+# MUR + emplacement du mur (128 à 255)
+MUR = 128
+
+
+def case(position):
+    """Indice du bit correspondant à la position (x, y)."""
+    return (position[0] - 1) + TAILLE * (position[1] - 1)
+
+
+def position(indice):
+    """Position (x, y) correspondant à l'indice d'une case."""
+    return (indice % TAILLE + 1, indice // TAILLE + 1)
+
+
+def bits(masque):
+    """Itère sur les indices des bits à 1 d'un masque."""
+    while masque:
+        bas = masque & -masque
+        yield bas.bit_length() - 1
+        masque ^= bas
+
+
+def emplacement(orientation, position_mur):
+    """Numéro (0 à 127) de l'emplacement d'un mur.
+
+    Les murs horizontaux occupent les emplacements 0 à 63 et les murs
+    verticaux les emplacements 64 à 127.
+    """
+    x, y = position_mur
+    if orientation == 'horizontal':
+        if not 1 <= x <= 8 or not 2 <= y <= 9:
+            raise ValueError("position du mur invalide!")
+        return (x - 1) + 8 * (y - 2)
+    if orientation == 'vertical':
+        if not 2 <= x <= 9 or not 1 <= y <= 8:
+            raise ValueError("position du mur invalide!")
+        return 64 + (x - 2) + 8 * (y - 1)
+    raise ValueError("orientation invalide!")
+
+
+def mur(numéro):
+    """Orientation et position (x, y) du mur d'un emplacement."""
+    if numéro < 64:
+        return 'horizontal', (numéro % 8 + 1, numéro // 8 + 2)
+    numéro -= 64
+    return 'vertical', (numéro % 8 + 2, numéro // 8 + 1)
+
+
+def code_coup(type_coup, position_coup):
+    """Code (0 à 255) d'un coup ('D', 'MH' ou 'MV', (x, y))."""
+    if type_coup == 'D':
+        return case(position_coup)
+    if type_coup == 'MH':
+        return MUR + emplacement('horizontal', position_coup)
+    if type_coup == 'MV':
+        return MUR + emplacement('vertical', position_coup)
+    raise ValueError("type de coup invalide!")
+
+
+def coup(code):
+    """Coup (type, x, y) correspondant à un code, comme retourné par jouer_coup."""
+    if code < MUR:
+        return ('D',) + position(code)
+    orientation, (x, y) = mur(code - MUR)
+    return ('MH' if orientation == 'horizontal' else 'MV', x, y)
+
+
+def _blocages(numéro):
+    """Masques (nord, sud, est, ouest) des arêtes coupées par un mur."""
+    orientation, (x, y) = mur(numéro)
+    if orientation == 'horizontal':
+        dessous = (1 << case((x, y - 1))) | (1 << case((x + 1, y - 1)))
+        return dessous, dessous << TAILLE, 0, 0
+    gauche = (1 << case((x - 1, y))) | (1 << case((x - 1, y + 1)))
+    return 0, 0, gauche, gauche << 1
+
+
+def _conflits(numéro):
+    """Masque des emplacements qui chevauchent ou croisent un mur."""
+    orientation, (x, y) = mur(numéro)
+    if orientation == 'horizontal':
+        voisins = [('horizontal', (x - 1, y)), ('horizontal', (x + 1, y)),
+                   ('vertical', (x + 1, y - 1))]
+    else:
+        voisins = [('vertical', (x, y - 1)), ('vertical', (x, y + 1)),
+                   ('horizontal', (x - 1, y + 1))]
+    masque = 1 << numéro
+    for orientation_voisin, position_voisin in voisins:
+        try:
+            masque |= 1 << emplacement(orientation_voisin, position_voisin)
+        except ValueError:
+            continue
+    return masque
+
+
+BLOCAGES = tuple(_blocages(numéro) for numéro in range(NB_EMPLACEMENTS))
+CONFLITS = tuple(_conflits(numéro) for numéro in range(NB_EMPLACEMENTS))
+
+
+def _miroir_emplacement(numéro):
+    """Emplacement du mur symétrique par rapport à la colonne 5."""
+    orientation, (x, y) = mur(numéro)
+    if orientation == 'horizontal':
+        return emplacement(orientation, (9 - x, y))
+    return emplacement(orientation, (11 - x, y))
+
+
+MIROIR_CASES = tuple(case((TAILLE + 1 - x, y)) for x, y in map(position, range(NB_CASES)))
+MIROIR_EMPLACEMENTS = tuple(_miroir_emplacement(numéro) for numéro in range(NB_EMPLACEMENTS))
+
+
+def miroir_murs(murs):
+    """Masque des murs symétriques (gauche-droite) d'un masque de murs."""
+    miroir = 0
+    for numéro in bits(murs):
+        miroir |= 1 << MIROIR_EMPLACEMENTS[numéro]
+    return miroir
+
+
+def _retournement_emplacement(numéro):
+    """Emplacement du mur symétrique par rapport à la rangée 5."""
+    orientation, (x, y) = mur(numéro)
+    if orientation == 'horizontal':
+        return emplacement(orientation, (x, 11 - y))
+    return emplacement(orientation, (x, 9 - y))
+
+
+RETOURNEMENT_CASES = tuple(case((x, TAILLE + 1 - y)) for x, y in map(position, range(NB_CASES)))
+RETOURNEMENT_EMPLACEMENTS = tuple(_retournement_emplacement(numéro)
+                                  for numéro in range(NB_EMPLACEMENTS))
+
+# Les quatre symétries du jeu: (cases, emplacements, échange des joueurs).
+# Retourner le plateau haut-bas échange les rangées d'arrivée, donc les
+# rôles des deux joueurs. Chaque symétrie est sa propre inverse.
+SYMÉTRIES = (
+    (tuple(range(NB_CASES)), tuple(range(NB_EMPLACEMENTS)), False),
+    (MIROIR_CASES, MIROIR_EMPLACEMENTS, False),
+    (RETOURNEMENT_CASES, RETOURNEMENT_EMPLACEMENTS, True),
+    (tuple(MIROIR_CASES[i] for i in RETOURNEMENT_CASES),
+     tuple(MIROIR_EMPLACEMENTS[i] for i in RETOURNEMENT_EMPLACEMENTS), True),
+)
+
+
+def symétrie_murs(murs, symétrie):
+    """Masque des murs images par une des SYMÉTRIES."""
+    if symétrie == 0:
+        return murs
+    emplacements = SYMÉTRIES[symétrie][1]
+    image = 0
+    for numéro in bits(murs):
+        image |= 1 << emplacements[numéro]
+    return image
+
+
+def symétrie_coup(code, symétrie):
+    """Code du coup image par une des SYMÉTRIES (et, de même, son antécédent)."""
+    cases, emplacements, _ = SYMÉTRIES[symétrie]
+    if code < MUR:
+        return cases[code]
+    return MUR + emplacements[code - MUR]
+
+
+class Plateau:
+    """
+    Murs et arêtes bloquées du plateau sous forme de masques de bits
+    """
+    __slots__ = ('nord', 'sud', 'est', 'ouest', 'murs')
+
+    def __init__(self, murs_horizontaux=(), murs_verticaux=()):
+        self.nord = LIGNE_9
+        self.sud = LIGNE_1
+        self.est = COLONNE_9
+        self.ouest = COLONNE_1
+        self.murs = 0
+        for position_mur in murs_horizontaux:
+            self.ajouter_mur(emplacement('horizontal', position_mur))
+        for position_mur in murs_verticaux:
+            self.ajouter_mur(emplacement('vertical', position_mur))
+
+    def ajouter_mur(self, numéro):
+        """Coupe les arêtes bloquées par le mur de l'emplacement numéro."""
+        nord, sud, est, ouest = BLOCAGES[numéro]
+        self.nord |= nord
+        self.sud |= sud
+        self.est |= est
+        self.ouest |= ouest
+        self.murs |= 1 << numéro
+
+    @classmethod
+    def depuis_murs(cls, murs):
+        """Plateau dont les murs sont donnés par un masque d'emplacements."""
+        plateau = cls()
+        for numéro in bits(murs):
+            plateau.ajouter_mur(numéro)
+        return plateau
+
+    def copie(self):
+        """Copie indépendante du plateau."""
+        copie = Plateau.__new__(Plateau)
+        copie.nord, copie.sud, copie.est, copie.ouest, copie.murs = (
+            self.nord, self.sud, self.est, self.ouest, self.murs)
+        return copie
+
+    def retirer_mur(self, numéro):
+        """Rétablit les arêtes coupées par le mur de l'emplacement numéro.
+
+        Deux murs placés selon les règles ne coupent jamais la même arête:
+        retirer un mur ne rouvre donc que ses propres arêtes.
+        """
+        nord, sud, est, ouest = BLOCAGES[numéro]
+        self.nord &= ~nord
+        self.sud &= ~sud
+        self.est &= ~est
+        self.ouest &= ~ouest
+        self.murs &= ~(1 << numéro)
+
+    def voisins(self, masque):
+        """Masque des cases atteignables en un pas depuis les cases du masque."""
+        return (((masque & ~self.nord) << TAILLE) | ((masque & ~self.sud) >> TAILLE) |
+                ((masque & ~self.est) << 1) | ((masque & ~self.ouest) >> 1))
+
+    def coups_pion(self, pion, autre):
+        """Masque des cases où le pion peut se déplacer, sauts compris.
+
+        Reprend les liens sauteurs de construire_graphe: saut en ligne droite
+        par-dessus l'autre pion si rien ne l'empêche, sinon vers chacun des
+        voisins de l'autre pion.
+        """
+        bit = 1 << pion
+        autre_bit = 1 << autre
+        cibles = self.voisins(bit)
+        if cibles & autre_bit:
+            cibles &= ~autre_bit
+            voisins_autre = self.voisins(autre_bit) & ~bit
+            saut = 2 * autre - pion
+            if 0 <= saut < NB_CASES and voisins_autre & (1 << saut):
+                cibles |= 1 << saut
+            else:
+                cibles |= voisins_autre
+        return cibles
+
+    def atteignable(self, pion, objectif):
+        """Vrai si la rangée objectif est atteignable depuis la case pion."""
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('parcours')
+        vus = front = 1 << pion
+        while front:
+            if front & objectif:
+                return True
+            front = self.voisins(front) & ~vus
+            vus |= front
+        return False
+
+    def niveaux(self, objectif, exclues=0):
+        """Liste des masques de cases à distance 0, 1, 2, ... de l'objectif.
+
+        Les cases du masque exclues ne sont jamais traversées.
+        """
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('parcours')
+        vus = exclues | objectif
+        front = objectif & ~exclues
+        résultat = []
+        while front:
+            résultat.append(front)
+            front = self.voisins(front) & ~vus
+            vus |= front
+        return résultat
+
+    def distances(self, objectif, exclues=0):
+        """Distance de chaque case à la rangée objectif (None si inatteignable)."""
+        résultat = [None] * NB_CASES
+        for distance, masque in enumerate(self.niveaux(objectif, exclues)):
+            while masque:
+                bas = masque & -masque
+                résultat[bas.bit_length() - 1] = distance
+                masque ^= bas
+        return résultat
+
+    def distance(self, pion, objectif):
+        """Nombre de pas entre la case pion et la rangée objectif, ou None."""
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('parcours')
+        vus = front = 1 << pion
+        distance = 0
+        while front:
+            if front & objectif:
+                return distance
+            front = self.voisins(front) & ~vus
+            vus |= front
+            distance += 1
+        return None
+
+    def premiers_pas(self, pion, autre, objectif, distances=None):
+        """Distances à l'objectif des cases atteignables au premier pas.
+
+        Retourne la liste des couples (distance, case) et la carte des
+        distances utilisée. Comme dans le graphe de construire_graphe, un
+        chemin ne repasse jamais par la case de départ: la carte n'est
+        recalculée sans cette case que si aucun premier pas ne peut s'en passer.
+        """
+        if distances is None:
+            distances = self.distances(objectif)
+        cibles = list(bits(self.coups_pion(pion, autre)))
+        pas = [(distances[cible], cible) for cible in cibles
+               if distances[cible] is not None]
+        if distances[pion] is not None and pas and min(pas)[0] > distances[pion]:
+            distances = self.distances(objectif, 1 << pion)
+            pas = [(distances[cible], cible) for cible in cibles
+                   if distances[cible] is not None]
+        return pas, distances
+
+    def couches_pion(self, pion, autre, objectif):
+        """Parcours en largeur depuis le pion, sauts compris.
+
+        Retourne la liste des masques de cases à 0, 1, 2, ... pas du pion,
+        jusqu'à la première couche qui touche l'objectif (None si elle est
+        inatteignable). Comme dans le graphe de construire_graphe, le chemin
+        ne repasse jamais par la case de départ.
+        """
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('parcours')
+        front = 1 << pion
+        couches = [front]
+        if front & objectif:
+            return couches
+        vus = front
+        front = self.coups_pion(pion, autre)
+        while front:
+            couches.append(front)
+            if front & objectif:
+                return couches
+            vus |= front
+            front = self.voisins(front) & ~vus
+        return None
+
+    def distance_pion(self, pion, autre, objectif, distances=None):
+        """Longueur du plus court chemin du pion vers son objectif, sauts compris.
+
+        C'est la longueur donnée par nx.shortest_path sur construire_graphe,
+        moins les deux extrémités. Une carte des distances déjà calculée pour
+        l'objectif évite le parcours.
+        """
+        if (1 << pion) & objectif:
+            return 0
+        if distances is not None:
+            pas, _ = self.premiers_pas(pion, autre, objectif, distances)
+            return min(pas)[0] + 1 if pas else None
+        couches = self.couches_pion(pion, autre, objectif)
+        return None if couches is None else len(couches) - 1
+
+    def distance_course(self, pion, autre, objectif, distances=None):
+        """distance_pion, ou la distance sans les pions si l'autre pion barre le passage.
+
+        distance_pion donne None quand l'autre pion bloque le seul passage:
+        la position est légale, le pion attend que le passage se libère.
+        Retourne None seulement si les murs enferment le pion.
+        """
+        distance = self.distance_pion(pion, autre, objectif, distances)
+        if distance is not None:
+            return distance
+        if distances is not None:
+            return distances[pion]
+        return self.distance(pion, objectif)
+
+    def _arêtes_chemin(self, pion, objectif):
+        """Arêtes d'un plus court chemin sans sauts, par direction.
+
+        Retourne (nord, est): la case du bas de chaque arête verticale et la
+        case de gauche de chaque arête horizontale, ou None si l'objectif est
+        inatteignable.
+        """
+        niveaux = self.niveaux(objectif)
+        courante = 1 << pion
+        niveau = next((i for i, masque in enumerate(niveaux) if masque & courante), None)
+        if niveau is None:
+            return None
+        nord = est = 0
+        for niveau in range(niveau - 1, -1, -1):
+            suivants = self.voisins(courante) & niveaux[niveau]
+            suivante = suivants & -suivants
+            if suivante == courante << TAILLE:
+                nord |= courante
+            elif suivante == courante >> TAILLE:
+                nord |= suivante
+            elif suivante == courante << 1:
+                est |= courante
+            else:
+                est |= suivante
+            courante = suivante
+        return nord, est
+
+    def murs_légaux(self, pion1, pion2):
+        """Masque des emplacements où un mur peut être posé.
+
+        Un mur légal ne chevauche ni ne croise aucun mur posé (table
+        CONFLITS) et laisse un chemin à chaque joueur. Un seul chemin par
+        joueur est calculé; seuls les murs qui coupent l'un de ces chemins
+        demandent un nouveau parcours.
+        """
+        chemins = [self._arêtes_chemin(pion1, OBJECTIFS[0]),
+                   self._arêtes_chemin(pion2, OBJECTIFS[1])]
+        if None in chemins:
+            return 0
+        nord = chemins[0][0] | chemins[1][0]
+        est = chemins[0][1] | chemins[1][1]
+        légaux = 0
+        for numéro in range(NB_EMPLACEMENTS):
+            if self.murs & CONFLITS[numéro]:
+                continue
+            blocage = BLOCAGES[numéro]
+            if blocage[0] & nord or blocage[2] & est:
+                self.ajouter_mur(numéro)
+                libre = (self.atteignable(pion1, OBJECTIFS[0]) and
+                         self.atteignable(pion2, OBJECTIFS[1]))
+                self.retirer_mur(numéro)
+                if not libre:
+                    continue
+            légaux |= 1 << numéro
+        return légaux
+
+    def _sur_les_chemins(self, couches, objectif):
+        """Masque des cases par lesquelles passe un plus court chemin."""
+        sur_chemin = couches[-1] & objectif
+        masque = sur_chemin
+        for couche in reversed(couches[1:-1]):
+            sur_chemin = couche & self.voisins(sur_chemin)
+            masque |= sur_chemin
+        return masque
+
+    def évaluer_murs(self, pion1, pion2, cache=None):
+        """Longueurs des plus courts chemins après chacun des murs légaux.
+
+        Retourne la liste des triplets (emplacement, distance du joueur 1,
+        distance du joueur 2) pour chaque mur qui ne chevauche aucun mur
+        posé et n'enferme aucun joueur. Un seul parcours par joueur sert pour
+        tous les murs qui ne coupent aucun plus court chemin; seuls les autres
+        sont réévalués, avec les cartes déjà présentes dans cache (un
+        CacheDistances) s'il est donné. Les distances sont celles de
+        distance_course: un pion bloqué par l'autre compte son chemin sans les
+        pions, et ses murs légaux restent tous évalués.
+        """
+        pions = (pion1, pion2)
+        couches = [self.couches_pion(pion1, pion2, OBJECTIFS[0]),
+                   self.couches_pion(pion2, pion1, OBJECTIFS[1])]
+        for i in range(2):
+            if couches[i] is None:
+                # Pion bloqué: parcours sans l'autre pion (autre = pion).
+                couches[i] = self.couches_pion(pions[i], pions[i], OBJECTIFS[i])
+        if None in couches:
+            return []
+        distances = [len(couches[0]) - 1, len(couches[1]) - 1]
+        chemins = [self._sur_les_chemins(couches[i], OBJECTIFS[i]) for i in range(2)]
+        autour_pions = (1 << pion1) | (1 << pion2)
+        résultat = []
+        for numéro in range(NB_EMPLACEMENTS):
+            if self.murs & CONFLITS[numéro]:
+                continue
+            nord, sud, est, ouest = BLOCAGES[numéro]
+            touche_pions = (nord | sud | est | ouest) & autour_pions
+            nouvelles = list(distances)
+            ajouté = False
+            for i in range(2):
+                if (touche_pions or (nord & chemins[i] and sud & chemins[i]) or
+                        (est & chemins[i] and ouest & chemins[i])):
+                    if not ajouté:
+                        self.ajouter_mur(numéro)
+                        ajouté = True
+                    carte = None if cache is None else cache.carte(self, i, False)
+                    nouvelles[i] = self.distance_course(pions[i], pions[1 - i], OBJECTIFS[i],
+                                                        carte)
+            if ajouté:
+                self.retirer_mur(numéro)
+            if None not in nouvelles:
+                résultat.append((numéro, nouvelles[0], nouvelles[1]))
+        return résultat
+
+    def chemin(self, pion, autre, objectif, distances=None):
+        """Un plus court chemin (liste de cases) du pion jusqu'à son objectif.
+
+        Retourne None si l'objectif est inatteignable. Une carte des
+        distances déjà calculée pour l'objectif évite un parcours. Avec autre
+        égal à pion, le chemin ne tient pas compte des pions.
+        """
+        chemin = [pion]
+        if (1 << pion) & objectif:
+            return chemin
+        pas, distances = self.premiers_pas(pion, autre, objectif, distances)
+        if not pas:
+            return None
+        distance, suivant = min(pas)
+        while True:
+            chemin.append(suivant)
+            if distance == 0:
+                return chemin
+            distance -= 1
+            for cible in bits(self.voisins(1 << suivant)):
+                if distances[cible] == distance:
+                    suivant = cible
+                    break
+
+
+class CacheDistances:
+    """
+    Cartes des distances aux deux rangées d'arrivée, par configuration de murs
+
+    Les entrées les moins récemment utilisées sont évincées au-delà de
+    capacité. Une configuration et ses images par les SYMÉTRIES partagent la
+    même entrée: retournée haut-bas, la carte d'un joueur devient celle de
+    l'autre. Un verrou protège l'ordre des entrées: le cache est partagé
+    par les fils du serveur (serveur.py).
+    """
+    def __init__(self, capacité=4096):
+        self.capacité = capacité
+        self.entrées = collections.OrderedDict()
+        self.verrou = threading.Lock()
+        # Configuration de murs -> (configuration canonique, symétrie)
+        self.canoniques = {}
+        self.succès = 0
+        self.échecs = 0
+
+    def carte(self, plateau, joueur, calculer=True):
+        """Distances de chaque case à la rangée d'arrivée du joueur (0 ou 1).
+
+        Sans calculer, retourne None si la carte n'est pas déjà en cache.
+        La liste retournée est partagée: ne pas la modifier.
+        """
+        murs = plateau.murs
+        canonique = self.canoniques.get(murs)
+        if canonique is None:
+            canonique = murs, 0
+            for symétrie in range(1, len(SYMÉTRIES)):
+                image = symétrie_murs(murs, symétrie)
+                if image < canonique[0]:
+                    canonique = image, symétrie
+            if len(self.canoniques) >= 4 * self.capacité:
+                self.canoniques.clear()
+            self.canoniques[murs] = canonique
+        clé, symétrie = canonique
+        cases, _, échange = SYMÉTRIES[symétrie]
+        rôle = 1 - joueur if échange else joueur
+        with self.verrou:
+            entrée = self.entrées.get(clé)
+            if entrée is None:
+                if not calculer:
+                    self.échecs += 1
+                    if INSTRUMENTS.actif:
+                        INSTRUMENTS.compter('cache_échecs')
+                    return None
+                entrée = self.entrées[clé] = [None, None]
+                if len(self.entrées) > self.capacité:
+                    self.entrées.popitem(last=False)
+            else:
+                self.entrées.move_to_end(clé)
+        carte = entrée[rôle]
+        if carte is None:
+            self.échecs += 1
+            if INSTRUMENTS.actif:
+                INSTRUMENTS.compter('cache_échecs')
+            if not calculer:
+                return None
+            carte = plateau.distances(OBJECTIFS[joueur])
+            if symétrie:
+                carte = [carte[i] for i in cases]
+            entrée[rôle] = carte
+        else:
+            self.succès += 1
+            if INSTRUMENTS.actif:
+                INSTRUMENTS.compter('cache_succès')
+        if symétrie:
+            return [carte[i] for i in cases]
+        return carte
+
+    def cartes(self, plateau):
+        """(distances vers la rangée 9, distances vers la rangée 1) du plateau."""
+        return self.carte(plateau, 0), self.carte(plateau, 1)
+
+    def vider(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self.verrou:
+            self.entrées.clear()
+        self.canoniques.clear()
+        self.succès = 0
+        self.échecs = 0
+
+
+CACHE = CacheDistances()
@@ -1,10 +1,17 @@
 """ module quoridor"""
 #pylint:disable=E1101
 
-import copy
+import io
 import random
-import itertools
-import networkx as nx
+import types
+
+from etat import EtatJeu
+from finale import coup_finale
+from instrumentation import INSTRUMENTS, mesuré
+from plateau import (CACHE, CONFLITS, MUR, NB_CASES, NB_EMPLACEMENTS, OBJECTIFS, Plateau, bits,
+                     case, coup, emplacement, mur as mur_de)
+from plateau import position as coordonnées
+from recherche import PROFONDEUR_MAX, Recherche
 
 
 class QuoridorError(Exception):
@@ -12,9 +19,21 @@ class QuoridorError(Exception):
     Classe pour gérer les exceptions s
     """
 
+def arêtes_mur(orientation, position):
+    """Arêtes (dans les deux sens) coupées par un mur."""
+    x, y = position
+    if orientation == 'horizontal':
+        return [((x, y-1), (x, y)), ((x, y), (x, y-1)),
+                ((x+1, y-1), (x+1, y)), ((x+1, y), (x+1, y-1))]
+    return [((x-1, y), (x, y)), ((x, y), (x-1, y)),
+            ((x-1, y+1), (x, y+1)), ((x, y+1), (x-1, y+1))]
+
+
 def graphe_helper(murs_horizontaux, murs_verticaux):
     """la fonction construire_graphe
     """
+    # networkx ne sert qu'au graphe de référence: il coûte cher à importer.
+    import networkx as nx
     graphe = nx.DiGraph()
     for x in range(1, 10):
         for y in range(1, 10):
@@ -26,22 +45,24 @@ def graphe_helper(murs_horizontaux, murs_verticaux):
                 graphe.add_edge((x, y), (x, y-1))
             if y < 9:
                 graphe.add_edge((x, y), (x, y+1))
-    for x, y in murs_horizontaux:
-        graphe.remove_edge((x, y-1), (x, y))
-        graphe.remove_edge((x, y), (x, y-1))
-        graphe.remove_edge((x+1, y-1), (x+1, y))
-        graphe.remove_edge((x+1, y), (x+1, y-1))
-    for x, y in murs_verticaux:
-        graphe.remove_edge((x-1, y), (x, y))
-        graphe.remove_edge((x, y), (x-1, y))
-        graphe.remove_edge((x-1, y+1), (x, y+1))
-        graphe.remove_edge((x, y+1), (x-1, y+1))
+    for position in murs_horizontaux:
+        for u, v in arêtes_mur('horizontal', position):
+            graphe.remove_edge(u, v)
+    for position in murs_verticaux:
+        for u, v in arêtes_mur('vertical', position):
+            graphe.remove_edge(u, v)
     return graphe
 
+
 def construire_graphe(joueurs, murs_horizontaux, murs_verticaux):
     """
     Crée le graphe des déplacements admissibles pour les joueurs.
+
+    Implémentation de référence: Quoridor utilise plateau.Plateau, qui doit
+    donner les mêmes déplacements et les mêmes longueurs de chemins.
     """
+    if INSTRUMENTS.actif:
+        INSTRUMENTS.compter('graphes')
     graphe = graphe_helper(murs_horizontaux, murs_verticaux)
     j1, j2 = tuple(joueurs[0]), tuple(joueurs[1])
     if j2 in graphe.successors(j1) or j1 in graphe.successors(j2):
@@ -55,7 +76,7 @@ def construire_graphe(joueurs, murs_horizontaux, murs_verticaux):
             if saut in graphe.successors(voisin):
                 graphe.add_edge(noeud, saut)
             else:
-                for saut in graphe.successors(voisin):
+                for saut in list(graphe.successors(voisin)):
                     graphe.add_edge(noeud, saut)
         ajouter_lien_sauteur(j1, j2)
         ajouter_lien_sauteur(j2, j1)
@@ -111,106 +132,169 @@ def check_total_murs(joueurs, murs):
         raise QuoridorError("mauvaise quantité totale de murs!")
 
 
+def _cadre_ascii():
+    """
+    Plateau ascii vide (sans la légende) et index où écrire pions et murs
+
+    INDEX_PIONS[case] est l'index du pion; INDEX_MURS[emplacement] est le
+    début des 7 '-' d'un mur horizontal, ou les 3 index des '|' d'un mur
+    vertical.
+    """
+    lignes = ['   ' + '-' * 35 + '\n']
+    for y in range(9, 0, -1):
+        lignes.append(f'{y} | ' + '   '.join('.' * 9) + ' |\n')
+        if y > 1:
+            lignes.append('  |' + ' ' * 35 + '|\n')
+    lignes.append('--|' + '-' * 35 + '\n')
+    lignes.append('  | ' + '   '.join('123456789') + '\n')
+
+    def indice(ligne, colonne):
+        # Les lignes font toutes 40 caractères, sauf la première (39).
+        return 39 + 40 * (ligne - 1) + colonne
+
+    pions = []
+    for numéro in range(NB_CASES):
+        x, y = coordonnées(numéro)
+        pions.append(indice(19 - 2 * y, 4 * x))
+    murs = []
+    for numéro in range(NB_EMPLACEMENTS):
+        orientation, (x, y) = mur_de(numéro)
+        if orientation == 'horizontal':
+            murs.append(indice(20 - 2 * y, 4 * x - 1))
+        else:
+            murs.append(tuple(indice(19 - 2 * y - i, 4 * x - 2) for i in range(3)))
+    return ''.join(lignes).encode('ascii'), tuple(pions), tuple(murs)
+
+
+CADRE_ASCII, INDEX_PIONS, INDEX_MURS = _cadre_ascii()
+
+
 class Quoridor:
     """Class quoridor"""
+    # Livre d'ouvertures (livre.Livre) consulté par jouer_coup, s'il est donné.
+    livre = None
+
     def __init__(self, joueurs, murs=None):
         """
         Initialisation de la classe Quoridor
+
+        La partie est conservée dans un EtatJeu (self.état); joueurs, murh
+        et murv en sont des vues au format du serveur, en lecture seule.
         """
-        self.joueurs = [{'nom':'', 'murs': 0, 'pos':(0, 0)},
-                        {'nom':'', 'murs': 0, 'pos':(0, 0)}]
-        self.murh = []
-        self.murv = []
         self.gameid = ''
 
         starting_position = [(5, 1), (5, 9)]
-        cjoueurs = copy.deepcopy(joueurs)
-        cmurs = copy.deepcopy(murs)
-        check_total_murs(cjoueurs, cmurs)
+        check_total_murs(joueurs, murs)
+        murh = []
+        murv = []
         if murs:
-            check_type(dict, cmurs, "murs n'est pas un dictionnaire!")
-            for mur in cmurs['horizontaux']:
+            for mur in murs['horizontaux']:
                 if not 1 <= mur[0] <= 8 or not 2 <= mur[1] <= 9:
                     raise QuoridorError("position du mur non-valide!")
-                self.murh += [tuple(mur)]
-            for mur in cmurs['verticaux']:
+                murh += [tuple(mur)]
+            for mur in murs['verticaux']:
                 if not 2 <= mur[0] <= 9 or not 1 <= mur[1] <= 8:
                     raise QuoridorError("position du mur non-valide!")
-                self.murv += [tuple(mur)]
-        check_iterable(cjoueurs)
-        for numero, joueur in enumerate(cjoueurs):
+                murv += [tuple(mur)]
+        noms = []
+        pions = []
+        restants = []
+        for numero, joueur in enumerate(joueurs):
             if isinstance(joueur, str):
-                self.joueurs[numero]['nom'] = joueur
-                self.joueurs[numero]['murs'] = 10
-                self.joueurs[numero]['pos'] = starting_position[numero]
+                noms += [joueur]
+                restants += [10]
+                pions += [case(starting_position[numero])]
             else:
-                if  not 0 <= joueur['murs'] <= 10:
-                    raise QuoridorError("mauvais nombre de murs!")
                 if not 1 <= joueur['pos'][0] <= 9 or not 1 <= joueur['pos'][1] <= 9:
                     raise QuoridorError("position du joueur invalide!")
-                self.joueurs[numero] = joueur
-                self.joueurs[numero]['pos'] = tuple(self.joueurs[numero]['pos'])
+                noms += [joueur['nom']]
+                restants += [joueur['murs']]
+                pions += [case(joueur['pos'])]
+        self.état = EtatJeu(Plateau(murh, murv), pions, restants, 0, noms)
+        self.dernière_recherche = None
+        self._vue = None
+
+    def _vues(self):
+        """
+        (joueurs, murh, murv) de l'état, gardés jusqu'au prochain coup
+
+        Les vues sont des tuples et des mappingproxy: les modifier lève une
+        erreur au lieu d'être perdu. Les coups passent par self.état.
+        """
+        clé = self.état.clé
+        if self._vue is not None and self._vue[0] == clé:
+            return self._vue[1]
+        dico = self.état.vers_dict()
+        vues = (tuple(types.MappingProxyType(joueur) for joueur in dico['joueurs']),
+                tuple(dico['murs']['horizontaux']),
+                tuple(dico['murs']['verticaux']))
+        self._vue = (clé, vues)
+        return vues
+
+    @property
+    def joueurs(self):
+        """Joueurs au format du serveur: ({'nom': ..., 'murs': ..., 'pos': (x, y)}, ...)"""
+        return self._vues()[0]
+
+    @property
+    def murh(self):
+        """Positions des murs horizontaux."""
+        return self._vues()[1]
+
+    @property
+    def murv(self):
+        """Positions des murs verticaux."""
+        return self._vues()[2]
+
+    @property
+    def plateau(self):
+        """Plateau (masques de bits) de l'état de la partie."""
+        return self.état.plateau
 
     def __str__(self):
         """
         Produit la représentation en art ascii
         """
-        board_positions = 9
-        spacing_horizontal = ((board_positions * 4) - 1)
-        game_pos_x = range(1, (board_positions * 4), 4)
-        game_pos_y = range(((board_positions - 1) * 2), -1, -2)
-        board = [
-            "légende: 1={} 2={}\n".format(self.joueurs[0]['nom'], self.joueurs[1]['nom']) +
-            (' ' * 3) + ('-' * spacing_horizontal) + '\n'
-        ]
-        for i in reversed(range((board_positions * 2) - 1)):
-            if (i % 2) == 0:
-                board += ["{}{}|".format((((i + 1) // 2) + 1),
-                                         (' ' * (1 - ((((i + 1) // 2) + 1) // 10))))]
-                board += [' ', '.']
-                board += ([' ', ' ', ' ', '.'] * (board_positions - 1))
-                board += [' ', '|\n']
+        return self.légende() + self.plateau_ascii().decode('ascii')
+
+    def légende(self):
+        """Première ligne de la représentation ascii: les noms des joueurs."""
+        return "légende: 1={} 2={}\n".format(*self.état.noms)
+
+    def plateau_ascii(self):
+        """
+        Représentation ascii sans la légende, en octets
+
+        Le cadre vide est copié, puis les pions et les murs y sont écrits aux
+        index précalculés.
+        """
+        état = self.état
+        tampon = bytearray(CADRE_ASCII)
+        for numéro, pion in enumerate(état.pions):
+            tampon[INDEX_PIONS[pion]] = ord('1') + numéro
+        for numéro in bits(état.plateau.murs):
+            if numéro < 64:
+                début = INDEX_MURS[numéro]
+                tampon[début:début + 7] = b'-------'
             else:
-                board += ["  |"]
-                board += ([' '] * spacing_horizontal)
-                board += ['|\n']
-        board += "--|" + ('-' * spacing_horizontal) + '\n'
-        board += (' ' * 2) + '| '
-        for i in range(1, board_positions):
-            board += str(i) + (' ')
-            board += (' ' * (2 - (i // 10)))
-        board += "{}\n".format(board_positions)
-        for num, joueur in enumerate(self.joueurs):
-            position = joueur["pos"]
-            if ((0 > position[0] > board_positions) or
-                    (0 > position[1] > board_positions)):
-                raise IndexError("Adresse du joueur invalide!")
-            indice = (game_pos_x[(position[0] - 1)] +
-                      (game_pos_y[(position[1] - 1)] * spacing_horizontal))
-            decallage = ((((indice + 1) // spacing_horizontal) * 2) + 2)
-            indice += decallage
-            board[indice] = str(num + 1)
-        for murh in self.murh:
-            if ((1 > murh[0] > (board_positions - 1)) or
-                    (2 > murh[1] > board_positions)):
-                raise IndexError("Position du mur horizontal invalide!")
-            indice = ((game_pos_x[(murh[0] - 1)] - 1) +
-                      ((game_pos_y[(murh[1] - 1)] + 1) * spacing_horizontal))
-            decallage = ((((indice + 1) // spacing_horizontal) * 2) + 2)
-            indice += decallage
-            for i in range(7):
-                board[(indice + i)] = '-'
-        for murv in self.murv:
-            if (2 > murv[0] > board_positions) or (1 > murv[1] > board_positions):
-                raise IndexError("Position du mur vertical invalide!")
-            indice = ((game_pos_x[(murv[0] - 1)] - 2) +
-                      (game_pos_y[(murv[1] - 1)] * spacing_horizontal))
-            decallage = ((((indice + 1) // spacing_horizontal) * 2) + 2)
-            indice += decallage
-            for i in range(3):
-                board[(indice - (i * (spacing_horizontal + 2)))] = '|'
-        return ''.join(board)
+                for indice in INDEX_MURS[numéro]:
+                    tampon[indice] = ord('|')
+        return bytes(tampon)
+
+    def écrire_ascii(self, fichier):
+        """
+        Écrit la représentation ascii dans un fichier, sans passer par une chaîne
+
+        Pour écrire beaucoup de plateaux (un par coup, par exemple), le
+        fichier est ouvert en binaire; un fichier texte reçoit str(self).
+        """
+        if isinstance(fichier, io.TextIOBase):
+            fichier.write(str(self))
+        else:
+            fichier.write(self.légende().encode('utf-8'))
+            fichier.write(self.plateau_ascii())
 
+    @mesuré('déplacer_jeton')
     def déplacer_jeton(self, joueur, position):
         """
         déplacer_jeton
@@ -219,24 +303,17 @@ class Quoridor:
             raise QuoridorError("joueur invalide!")
         if not 1 <= position[0] <= 9 or not 1 <= position[1] <= 9:
             raise QuoridorError("position invalide!")
-        graphe = construire_graphe(
-            [joueur['pos'] for joueur in self.joueurs],
-            self.murh,
-            self.murv
-        )
-        if tuple(position) not in list(graphe.successors(tuple(self.joueurs[(joueur - 1)]['pos']))):
+        cibles = self.plateau.coups_pion(self.état.pions[(joueur - 1)],
+                                         self.état.pions[(2 - joueur)])
+        if not cibles & (1 << case(position)):
             raise QuoridorError("mouvement invalide!")
-        self.joueurs[(joueur - 1)]['pos'] = position
+        self.état.appliquer(case(position), (joueur - 1))
 
     def état_partie(self):
         """
         état_partie
         """
-        return {"joueurs": self.joueurs,
-                "murs":{
-                    "horizontaux": self.murh,
-                    "verticaux": self.murv
-                    }}
+        return self.état.vers_dict()
 
     def switch_mur(self, joueur, pos, sens):
         """fonction pour alléger auto_placer_mur
@@ -246,61 +323,119 @@ class Quoridor:
             return ('MH', pos[0], pos[1])
         return ('MV', pos[0], pos[1])
 
-    def auto_placer_mur(self, joueur, chemin1, chemin2, attempts):
+    @mesuré('évaluer_murs')
+    def évaluer_murs(self):
+        """
+        Longueurs des plus courts chemins des deux joueurs après chaque mur légal.
+
+        Retourne un dictionnaire {('MH'|'MV', x, y): (distance 1, distance 2)}
+        calculé en une seule passe sur le plateau.
+        """
+        résultat = {}
+        for numéro, dist1, dist2 in self.plateau.évaluer_murs(*self.état.pions, cache=CACHE):
+            sens, pos = mur_de(numéro)
+            type_coup = 'MH' if sens == 'horizontal' else 'MV'
+            résultat[(type_coup, pos[0], pos[1])] = (dist1, dist2)
+        return résultat
+
+    def chemin_course(self, joueur, cartes=None):
+        """
+        Plus court chemin du joueur, en positions (x, y), départ compris.
+
+        Si l'autre pion barre le seul passage, c'est le chemin sans les pions
+        (plateau.Plateau.distance_course): le pion attend qu'il se libère.
+        """
+        if cartes is None:
+            cartes = CACHE.cartes(self.plateau)
+        pion = self.état.pions[(joueur - 1)]
+        autre = self.état.pions[(2 - joueur)]
+        objectif = OBJECTIFS[(joueur - 1)]
+        chemin = self.plateau.chemin(pion, autre, objectif, cartes[(joueur - 1)])
+        if chemin is None:
+            chemin = self.plateau.chemin(pion, pion, objectif, cartes[(joueur - 1)])
+        return [coordonnées(c) for c in chemin]
+
+    @mesuré('auto_placer_mur')
+    def auto_placer_mur(self, joueur, chemin1, chemin2):
         """fonction pour assister jouer_coup
         """
-        if attempts >= 2:
+        if self.état.murs[(joueur - 1)] <= 0:
             return False
 
-        try:
-            objectifs = ['B1', 'B2']
-            adversaire = 1
-            if adversaire == joueur:
-                adversaire = 2
-            for c, sens in itertools.product(chemin2[1:-1], ['horizontal', 'vertical']):
-                for pos in [((c[0] - 1), c[1]),
-                            ((c[0] + 1), (c[1])),
-                            (c[0], (c[1] - 1)),
-                            (c[0], (c[1] + 1))]:
-                    try:
-                        graphe = ''
-                        if sens == 'horizontal':
-                            graphe = construire_graphe([joueur['pos'] for
-                                                        joueur in self.joueurs],
-                                                       (self.murh + [pos]),
-                                                       self.murv
-                                                      )
-                        else:
-                            graphe = construire_graphe([joueur['pos'] for
-                                                        joueur in self.joueurs],
-                                                       self.murh,
-                                                       (self.murv + [pos])
-                                                      )
-                        chem1 = nx.shortest_path(graphe,
-                                                 tuple(self.joueurs[(joueur - 1)]['pos']),
-                                                 objectifs[(joueur - 1)])
-                        chem2 = nx.shortest_path(graphe,
-                                                 tuple(self.joueurs[(adversaire - 1)]['pos']),
-                                                 objectifs[(adversaire - 1)])
-                        if len(chem2) > len(chemin2) and len(chem1) <= len(chemin1):
-                            return self.switch_mur(joueur, pos, sens)
-                    except nx.exception.NetworkXError:
-                        continue
+        adversaire = 1
+        if adversaire == joueur:
+            adversaire = 2
+        meilleur = None
+        évalués = self.évaluer_murs()
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('murs_essayés', len(évalués))
+        for (type_coup, x, y), distances in évalués.items():
+            dist1 = distances[(joueur - 1)]
+            dist2 = distances[(adversaire - 1)]
+            if dist2 >= len(chemin2) and dist1 < len(chemin1):
+                if meilleur is None or dist2 - dist1 > meilleur[0]:
+                    meilleur = (dist2 - dist1, type_coup, (x, y))
+        if meilleur is None:
             return False
-        except (QuoridorError,
-                nx.exception.NetworkXError,
-                nx.exception.NetworkXNoPath):
-            return self.auto_placer_mur(joueur,
-                                        chemin1[attempts:],
-                                        chemin2[attempts:],
-                                        (attempts + 1))
+        sens = 'horizontal' if meilleur[1] == 'MH' else 'vertical'
+        return self.switch_mur(joueur, meilleur[2], sens)
+
+    @mesuré('chercher_coup')
+    def chercher_coup(self, joueur, profondeur=None, noeuds_max=None, temps_max=None,
+                      prévu=None):
+        """
+        Cherche le meilleur coup du joueur par alpha-bêta sans le jouer.
+
+        Sans aucun budget, la recherche va à la profondeur 3. Avec temps_max
+        (en secondes) seul, elle approfondit tant qu'il reste du temps.
+        prévu, un (code, profondeur, temps) préparé d'avance par
+        anticipation.Anticipation.réplique, est joué tout de suite s'il a été
+        cherché à profondeur, ou au moins temps_max secondes: une recherche
+        normale n'irait pas plus loin. Sinon, la recherche reprend à la
+        profondeur suivante, avec le temps qui reste. Retourne le coup sous la
+        forme (type, x, y), comme jouer_coup, et garde dans dernière_recherche
+        la profondeur atteinte, le nombre de noeuds visités, la durée et si un
+        coup prévu a servi.
+        """
+        if joueur not in (1, 2):
+            raise QuoridorError("joueur invalide!")
+        if self.partie_terminée():
+            raise QuoridorError("La partie est déjà terminée!")
+        if profondeur is None:
+            profondeur = 3 if temps_max is None else PROFONDEUR_MAX
+        code_prévu, profondeur_prévue, temps_prévu = prévu or (None, 0, 0.0)
+        if prévu is not None and (profondeur_prévue >= profondeur or
+                                  (temps_max is not None and temps_prévu >= temps_max)):
+            self.dernière_recherche = {'profondeur': profondeur_prévue, 'noeuds': 0,
+                                       'temps': 0.0, 'anticipé': True}
+            return coup(code_prévu)
+        if temps_max is not None:
+            temps_max = max(0.0, temps_max - temps_prévu)
+        position = self.état.copie(trait=(joueur - 1))
+        recherche = Recherche(profondeur, noeuds_max, temps_max=temps_max)
+        code = recherche.meilleur_coup(position, code_prévu, profondeur_prévue + 1)
+        if INSTRUMENTS.actif:
+            INSTRUMENTS.compter('noeuds', recherche.noeuds)
+        self.dernière_recherche = {'profondeur': max(recherche.profondeur_atteinte,
+                                                     profondeur_prévue),
+                                   'noeuds': recherche.noeuds,
+                                   'temps': recherche.durée,
+                                   'anticipé': prévu is not None}
+        return coup(code)
 
-    def jouer_coup(self, joueur):
+    @mesuré('jouer_coup')
+    def jouer_coup(self, joueur, profondeur=None, noeuds_max=None, temps_max=None,
+                   prévu=None):
         """
         jouer_coup
 
+        Joue le coup du livre d'ouvertures s'il connaît la position, puis
+        le coup exact de finale.coup_finale quand un joueur n'a plus de murs
+        et que la finale est résolue. Sinon, sans profondeur ni budget
+        (noeuds_max, temps_max en secondes), joue un pas sur le plus court
+        chemin ou un mur choisi par auto_placer_mur, et avec un budget, le
+        coup trouvé par chercher_coup, qui reçoit prévu.
         """
-        objectifs = ['B1', 'B2']
         adversaire = 1
         if adversaire == joueur:
             adversaire = 2
@@ -308,40 +443,85 @@ class Quoridor:
             raise QuoridorError("joueur invalide!")
         if self.partie_terminée():
             raise QuoridorError("La partie est déjà terminée!")
-        graphe = construire_graphe(
-            [joueur['pos'] for joueur in self.joueurs],
-            self.murh,
-            self.murv
-        )
-        chemin1 = nx.shortest_path(graphe,
-                                   tuple(self.joueurs[(joueur - 1)]['pos']),
-                                   objectifs[(joueur - 1)])
-        chemin2 = nx.shortest_path(graphe,
-                                   tuple(self.joueurs[(adversaire - 1)]['pos']),
-                                   objectifs[(adversaire - 1)])
-        dice = random.choices([True, False], weights=[10, self.joueurs[(joueur-1)]['murs']], k=1)
+        self.dernière_recherche = None
+        if self.livre is not None:
+            code = self.livre.coup(self.état.copie(trait=(joueur - 1)))
+            if code is not None:
+                try:
+                    return self.jouer(joueur, coup(code))
+                except QuoridorError:
+                    pass
+        if not all(self.état.murs):
+            code = coup_finale(self.état.copie(trait=(joueur - 1)))
+            if code is not None:
+                return self.jouer(joueur, coup(code))
+        if profondeur is not None or noeuds_max is not None or temps_max is not None:
+            return self.jouer(joueur, self.chercher_coup(joueur, profondeur,
+                                                         noeuds_max, temps_max, prévu))
+        pion1 = self.état.pions[(joueur - 1)]
+        pion2 = self.état.pions[(adversaire - 1)]
+        cartes = CACHE.cartes(self.plateau)
+        chemin1 = self.chemin_course(joueur, cartes)
+        chemin2 = self.chemin_course(adversaire, cartes)
+        dice = random.choices([True, False], weights=[10, self.état.murs[(joueur-1)]], k=1)
         if ((dice == [True]) or
-                (len(chemin2) < len(chemin1) <= 3) or
+                (len(chemin2) < len(chemin1) <= 2) or
                 (len(chemin2) < (len(chemin1) - 2))):
-            result = self.auto_placer_mur(joueur, chemin1, chemin2, 1)
+            result = self.auto_placer_mur(joueur, chemin1, chemin2)
             if result:
                 return result
 
-        self.déplacer_jeton(joueur, chemin1[1])
-        return ('D', chemin1[1][0], chemin1[1][1])
+        pas = chemin1[1]
+        cibles = self.plateau.coups_pion(pion1, pion2)
+        if not cibles & (1 << case(pas)):
+            # Pion bloqué par l'autre: le déplacement permis le plus proche du but.
+            carte = cartes[(joueur - 1)]
+            pas = coordonnées(min(bits(cibles), key=lambda cible: carte[cible]))
+        self.déplacer_jeton(joueur, pas)
+        return ('D', pas[0], pas[1])
+
+    @mesuré('jouer_coup_mcts')
+    def jouer_coup_mcts(self, joueur, temps_max=1.0, processus=None):
+        """
+        Joue le coup choisi par une recherche Monte-Carlo sur processus coeurs.
+
+        La qualité du coup croît avec le temps et le nombre de processus
+        (tous les coeurs par défaut). Les statistiques vont dans
+        dernière_recherche.
+        """
+        if joueur not in (1, 2):
+            raise QuoridorError("joueur invalide!")
+        if self.partie_terminée():
+            raise QuoridorError("La partie est déjà terminée!")
+        import mcts
+        état = self.état.copie(trait=(joueur - 1)).compact()
+        code, self.dernière_recherche = mcts.chercher(état, temps_max, processus)
+        return self.jouer(joueur, coup(code))
+
+    def jouer(self, joueur, coup_choisi):
+        """
+        Joue un coup de la forme (type, x, y) et le retourne.
+        """
+        type_coup, x, y = coup_choisi
+        if type_coup == 'D':
+            self.déplacer_jeton(joueur, (x, y))
+        elif type_coup == 'MH':
+            self.placer_mur(joueur, (x, y), 'horizontal')
+        elif type_coup == 'MV':
+            self.placer_mur(joueur, (x, y), 'vertical')
+        else:
+            raise QuoridorError("type de coup invalide!")
+        return coup_choisi
 
     def partie_terminée(self):
         """
         Évalue si la partie est terminée
         """
-        condition_de_victoire = [9, 1]
-        # itérer sur chaque joueurs
-        for numero, joueur in enumerate(self.joueurs):
-            # Vérifier si le joueur rempli les conditions de victoires
-            if joueur['pos'][1] == condition_de_victoire[(numero)]:
-                # Retourner le nom du joueur gagnant
-                return joueur['nom']
-        return False
+        gagnant = self.état.gagnant()
+        if gagnant is None:
+            return False
+        # Retourner le nom du joueur gagnant
+        return self.état.noms[gagnant]
 
     def check_positionh(self, position):
         """fonction pour alléger le nombre
@@ -350,17 +530,7 @@ class Quoridor:
 
         if not 1 <= position[0] <= 8 or not 2 <= position[1] <= 9:
             raise QuoridorError("position du mur invalide!")
-        if (position[0], position[1]) in self.murh:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [position[0], position[1]] in self.murh:
-            raise QuoridorError("Il y a déjà un mur!")
-        if ((position[0] - 1), position[1]) in self.murh:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [(position[0] - 1), position[1]] in self.murh:
-            raise QuoridorError("Il y a déjà un mur!")
-        if ((position[0] + 1), (position[1] - 1)) in self.murv:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [(position[0] + 1), (position[1] - 1)] in self.murv:
+        if self.plateau.murs & CONFLITS[emplacement('horizontal', position)]:
             raise QuoridorError("Il y a déjà un mur!")
 
     def check_positionv(self, position):
@@ -368,57 +538,60 @@ class Quoridor:
         """
         if not 2 <= position[0] <= 9 or not 1 <= position[1] <= 8:
             raise QuoridorError("position du mur invalide!")
-        if (position[0], position[1]) in self.murv:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [position[0], position[1]] in self.murv:
-            raise QuoridorError("Il y a déjà un mur!")
-        if (position[0], (position[1] - 1)) in self.murv:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [position[0], (position[1] - 1)] in self.murv:
-            raise QuoridorError("Il y a déjà un mur!")
-        if ((position[0] - 1), (position[1] + 1)) in self.murh:
-            raise QuoridorError("Il y a déjà un mur!")
-        if [(position[0] - 1), (position[1] + 1)] in self.murh:
+        if self.plateau.murs & CONFLITS[emplacement('vertical', position)]:
             raise QuoridorError("Il y a déjà un mur!")
 
+    def coups_légaux(self, joueur):
+        """
+        Génère les coups légaux (type, x, y) du joueur: déplacements, puis murs.
+        """
+        if joueur not in (1, 2):
+            raise QuoridorError("joueur invalide!")
+        for code in self.état.coups_légaux(joueur - 1):
+            yield coup(code)
+
+    @mesuré('placer_mur')
     def placer_mur(self, joueur: int, position: tuple, orientation: str):
         """
         placer_mur
 
         """
 
-        objectif = ['B1', 'B2']
         if joueur not in (1, 2):
             raise QuoridorError("joueur invalide!")
-        if self.joueurs[(joueur - 1)]['murs'] <= 0:
+        if self.état.murs[(joueur - 1)] <= 0:
             raise QuoridorError("le joueur ne peut plus placer de murs!")
         if not isinstance(position[0], int) or not isinstance(position[1], int):
             raise QuoridorError("position invalide!")
         if orientation == 'horizontal':
             self.check_positionh(position)
-            graphe = construire_graphe(
-                [joueur['pos'] for joueur in self.joueurs],
-                (self.murh + [position]),
-                self.murv
-            )
-
-            for i in range(2):
-                if not nx.has_path(graphe, (tuple(self.joueurs[i]['pos'])), objectif[i]):
-                    raise QuoridorError("ce coup enfermerait un joueur")
-            self.murh += [position]
-            self.joueurs[(joueur - 1)]['murs'] -= 1
         elif orientation == 'vertical':
             self.check_positionv(position)
-            graphe = construire_graphe(
-                [joueur['pos'] for joueur in self.joueurs],
-                self.murh,
-                (self.murv + [position])
-            )
-            for i in range(2):
-                if not nx.has_path(graphe, (tuple(self.joueurs[i]['pos'])), objectif[i]):
-                    raise QuoridorError("ce coup enfermerait un joueur")
-            self.murv += [position]
-            self.joueurs[(joueur - 1)]['murs'] -= 1
         else:
             raise QuoridorError("orientation invalide!")
-        
\ No newline at end of file
+        numéro = emplacement(orientation, position)
+        self.plateau.ajouter_mur(numéro)
+        cartes = CACHE.cartes(self.plateau)
+        self.plateau.retirer_mur(numéro)
+        enfermé = any(cartes[i][self.état.pions[i]] is None for i in range(2))
+        if enfermé:
+            if INSTRUMENTS.actif:
+                INSTRUMENTS.compter('murs_refusés')
+            raise QuoridorError("ce coup enfermerait un joueur")
+        self.état.appliquer(MUR + numéro, (joueur - 1))
+
+    def annuler_mur(self, joueur: int, position: tuple, orientation: str):
+        """
+        Retire un mur placé par le joueur et lui rend ce mur.
+        """
+        if joueur not in (1, 2):
+            raise QuoridorError("joueur invalide!")
+        try:
+            numéro = emplacement(orientation, position)
+        except ValueError as erreur:
+            raise QuoridorError(str(erreur))
+        if not self.plateau.murs & (1 << numéro):
+            raise QuoridorError("Il n'y a pas de mur à cette position!")
+        if self.état.murs[(joueur - 1)] >= 10:
+            raise QuoridorError("mauvais nombre de murs!")
+        self.état.rendre_mur(numéro, (joueur - 1))
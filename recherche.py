@@ -0,0 +1,199 @@
+""" module recherche
+
+Recherche alpha-bêta (negamax) avec approfondissement itératif, tri des
+coups et table de transposition indexée par la clé de Zobrist des
+positions (etat.EtatJeu), jouées et annulées sur place.
+"""
+
+import time
+
+from plateau import CACHE, MUR, OBJECTIFS, bits
+
+VICTOIRE = 100000
+PROFONDEUR_MAX = 64
+EXACTE, MINORANT, MAJORANT = 0, 1, 2
+
+
+class BudgetÉpuisé(Exception):
+    """
+    Levée quand la recherche dépasse son budget de noeuds ou de temps
+    """
+
+
+class Recherche:
+    """
+    Moteur negamax alpha-bêta
+
+    profondeur: profondeur maximale de l'approfondissement itératif.
+    noeuds_max: budget de noeuds (None pour aucune limite).
+    temps_max: budget en secondes (None pour aucune limite).
+    largeur_murs: nombre de murs gardés à chaque noeud après le tri (None
+    pour les garder tous).
+
+    Quand un budget est épuisé, la recherche retourne le meilleur coup de
+    la dernière itération, ou celui de l'itération interrompue si elle a
+    déjà trouvé mieux.
+    """
+    def __init__(self, profondeur=3, noeuds_max=None, largeur_murs=8, temps_max=None):
+        self.profondeur = profondeur
+        self.noeuds_max = noeuds_max
+        self.temps_max = temps_max
+        self.largeur_murs = largeur_murs
+        self.table = {}
+        self.noeuds = 0
+        self.profondeur_atteinte = 0
+        self.durée = 0.0
+        self.échéance = None
+
+    def évaluer(self, position):
+        """Évaluation statique du point de vue du joueur au trait."""
+        joueur = position.trait
+        adversaire = 1 - joueur
+        plateau = position.plateau
+        pions = position.pions
+        cartes = CACHE.cartes(plateau)
+        # Un pion bloqué un moment par l'autre compte sa distance sans les pions.
+        dist_joueur = plateau.distance_course(pions[joueur], pions[adversaire], OBJECTIFS[joueur],
+                                              cartes[joueur])
+        dist_adversaire = plateau.distance_course(pions[adversaire], pions[joueur],
+                                                  OBJECTIFS[adversaire], cartes[adversaire])
+        return (10 * (dist_adversaire - dist_joueur) + 5 +
+                2 * (position.murs[joueur] - position.murs[adversaire]))
+
+    def coups(self, position, meilleur=None):
+        """Coups du joueur au trait, les plus prometteurs d'abord."""
+        joueur = position.trait
+        adversaire = 1 - joueur
+        plateau = position.plateau
+        pions = position.pions
+        cartes = CACHE.cartes(plateau)
+        pas, _ = plateau.premiers_pas(pions[joueur], pions[adversaire],
+                                      OBJECTIFS[joueur], cartes[joueur])
+        if pas:
+            coups = [cible for _, cible in sorted(pas)]
+            dist_joueur = min(pas)[0] + 1
+        else:
+            # Bloqué par l'autre pion: aucun pas ne rapproche, tous sont permis.
+            coups = list(bits(plateau.coups_pion(pions[joueur], pions[adversaire])))
+            dist_joueur = cartes[joueur][pions[joueur]]
+        if position.murs[joueur] > 0:
+            dist_adversaire = plateau.distance_course(pions[adversaire], pions[joueur],
+                                                      OBJECTIFS[adversaire], cartes[adversaire])
+            évalués = plateau.évaluer_murs(pions[0], pions[1], CACHE)
+            murs = sorted(((nouvelles[adversaire] - dist_adversaire) -
+                           (nouvelles[joueur] - dist_joueur), MUR + numéro)
+                          for numéro, *nouvelles in évalués)
+            murs = [code for gain, code in reversed(murs) if gain > 0]
+            coups += murs[:self.largeur_murs]
+        if meilleur is not None and meilleur in coups:
+            coups.remove(meilleur)
+            coups.insert(0, meilleur)
+        return coups
+
+    def negamax(self, position, profondeur, alpha, beta):
+        """Valeur de la position pour le joueur au trait."""
+        self.noeuds += 1
+        if self.noeuds_max is not None and self.noeuds > self.noeuds_max:
+            raise BudgetÉpuisé()
+        if self.échéance is not None and time.perf_counter() > self.échéance:
+            raise BudgetÉpuisé()
+        if position.gagnant() is not None:
+            # Le joueur qui vient de jouer a gagné: plus tôt c'est, pire c'est.
+            return -(VICTOIRE + profondeur)
+        if profondeur == 0:
+            return self.évaluer(position)
+
+        alpha_initial = alpha
+        entrée = self.table.get(position.clé)
+        meilleur = None
+        if entrée is not None:
+            prof_entrée, valeur, borne, meilleur = entrée
+            if prof_entrée >= profondeur:
+                if borne == EXACTE:
+                    return valeur
+                if borne == MINORANT:
+                    alpha = max(alpha, valeur)
+                elif borne == MAJORANT:
+                    beta = min(beta, valeur)
+                if alpha >= beta:
+                    return valeur
+
+        meilleure_valeur = -2 * VICTOIRE
+        for code in self.coups(position, meilleur):
+            position.appliquer(code)
+            try:
+                valeur = -self.negamax(position, profondeur - 1, -beta, -alpha)
+            finally:
+                position.annuler(code)
+            if valeur > meilleure_valeur:
+                meilleure_valeur = valeur
+                meilleur = code
+            alpha = max(alpha, valeur)
+            if alpha >= beta:
+                break
+
+        if meilleure_valeur <= alpha_initial:
+            borne = MAJORANT
+        elif meilleure_valeur >= beta:
+            borne = MINORANT
+        else:
+            borne = EXACTE
+        self.table[position.clé] = (profondeur, meilleure_valeur, borne, meilleur)
+        return meilleure_valeur
+
+    def racine(self, position, profondeur, meilleur):
+        """Cherche à la racine en retenant le meilleur coup au fur et à mesure.
+
+        Retourne (valeur, coup) pour l'itération complète. Si le budget
+        s'épuise en cours de route, BudgetÉpuisé porte le meilleur coup
+        trouvé jusque-là (ou None si aucun coup n'a été évalué).
+        """
+        alpha, beta = -2 * VICTOIRE, 2 * VICTOIRE
+        meilleure_valeur = None
+        for code in self.coups(position, meilleur):
+            position.appliquer(code)
+            try:
+                valeur = -self.negamax(position, profondeur - 1, -beta, -alpha)
+            except BudgetÉpuisé:
+                raise BudgetÉpuisé(meilleur if meilleure_valeur is not None else None)
+            finally:
+                position.annuler(code)
+            if meilleure_valeur is None or valeur > meilleure_valeur:
+                meilleure_valeur = valeur
+                meilleur = code
+                alpha = max(alpha, valeur)
+        self.table[position.clé] = (profondeur, meilleure_valeur, EXACTE, meilleur)
+        return meilleure_valeur, meilleur
+
+    def meilleur_coup(self, position, premier=None, départ=1):
+        """Code du meilleur coup trouvé pour le joueur au trait.
+
+        premier: coup essayé en premier dès la première itération, par
+        exemple celui préparé par anticipation. départ: profondeur de la
+        première itération, pour reprendre une recherche déjà menée jusqu'à
+        départ - 1; premier est alors retourné si aucune itération n'aboutit.
+        """
+        début = time.perf_counter()
+        self.noeuds = 0
+        self.profondeur_atteinte = 0
+        self.échéance = None if self.temps_max is None else début + self.temps_max
+        meilleur = premier
+        try:
+            for profondeur in range(départ, self.profondeur + 1):
+                try:
+                    valeur, meilleur = self.racine(position, profondeur, meilleur)
+                except BudgetÉpuisé as interruption:
+                    # Le meilleur coup précédent est cherché en premier: un
+                    # coup retenu par l'itération interrompue vaut au moins autant.
+                    if interruption.args and interruption.args[0] is not None:
+                        meilleur = interruption.args[0]
+                    break
+                self.profondeur_atteinte = profondeur
+                if abs(valeur) >= VICTOIRE:
+                    break
+        finally:
+            self.échéance = None
+            self.durée = time.perf_counter() - début
+        if meilleur is None:
+            meilleur = self.coups(position)[0]
+        return meilleur
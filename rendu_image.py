@@ -0,0 +1,349 @@
+"""Quoridor - module rendu_image
+
+Images du plateau sans turtle ni écran: SVG, et PNG encodé ici avec zlib.
+Une position est un Quoridor ou un état au format du serveur
+(état_partie). Le mode par lots rend toutes les positions de parties
+enregistrées (module enregistrement), une image par fichier ou toutes sur
+une même planche, avec un processus par coeur.
+
+    python rendu_image.py parties.qrd -o images --format png
+    python rendu_image.py parties.qrd --planche planche.png --case 12
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import os
+import struct
+import zlib
+
+from enregistrement import ArchiveParties, positions
+
+COULEURS = {
+    'fond': (245, 238, 220),
+    'case': (205, 175, 125),
+    'pion1': (200, 30, 30),
+    'pion2': (30, 140, 50),
+    'mur': (30, 60, 170),
+}
+
+SIGNATURE_PNG = b'\x89PNG\r\n\x1a\n'
+
+
+def _état(position):
+    """État au format du serveur d'un Quoridor ou d'un état déjà en dictionnaire."""
+    if isinstance(position, dict):
+        return position
+    return position.état_partie()
+
+
+class Gabarit:
+    """
+    Dimensions de l'image pour un côté de case donné, en pixels
+
+    Les murs occupent les sillons (espace) entre les cases. Le fond (les
+    cases) est calculé une fois par gabarit; chaque image n'y ajoute que
+    les pions et les murs.
+    """
+    def __init__(self, case=40):
+        self.case = case
+        self.espace = max(2, case // 5)
+        self.marge = self.espace
+        self.pas = case + self.espace
+        self.taille = 2 * self.marge + 9 * case + 8 * self.espace
+        # Une ligne PNG: l'octet de filtre (0), puis trois octets par pixel.
+        self.ligne = 1 + 3 * self.taille
+        self._fond = None
+        self._fond_svg = None
+
+    def coin(self, x, y):
+        """Coin haut gauche de la case (x, y); la rangée 9 est en haut."""
+        return self.marge + (x - 1) * self.pas, self.marge + (9 - y) * self.pas
+
+    def rectangles(self, état):
+        """(rôle, gauche, haut, largeur, hauteur) des pions et des murs de l'état."""
+        résultat = []
+        retrait = self.case // 5
+        côté = self.case - 2 * retrait
+        for numéro, joueur in enumerate(état['joueurs']):
+            gauche, haut = self.coin(*joueur['pos'])
+            résultat.append((f'pion{numéro + 1}', gauche + retrait, haut + retrait, côté, côté))
+        long = 2 * self.case + self.espace
+        for x, y in état['murs']['horizontaux']:
+            # Sous la rangée y, le long des colonnes x et x + 1.
+            gauche, haut = self.coin(x, y)
+            résultat.append(('mur', gauche, haut + self.case, long, self.espace))
+        for x, y in état['murs']['verticaux']:
+            # À gauche de la colonne x, le long des rangées y et y + 1.
+            gauche, haut = self.coin(x, y + 1)
+            résultat.append(('mur', gauche - self.espace, haut, self.espace, long))
+        return résultat
+
+    def _peindre(self, pixels, gauche, haut, largeur, hauteur, couleur):
+        motif = bytes(couleur) * largeur
+        début = haut * self.ligne + 1 + 3 * gauche
+        for _ in range(hauteur):
+            pixels[début:début + 3 * largeur] = motif
+            début += self.ligne
+
+    def fond(self):
+        """Pixels du plateau vide (lignes PNG, octet de filtre compris)."""
+        if self._fond is None:
+            pixels = bytearray(b'\x00' + bytes(COULEURS['fond']) * self.taille) * self.taille
+            for x in range(1, 10):
+                for y in range(1, 10):
+                    self._peindre(pixels, *self.coin(x, y), self.case, self.case,
+                                  COULEURS['case'])
+            self._fond = bytes(pixels)
+        return self._fond
+
+    def pixels(self, position):
+        """Pixels de la position (lignes PNG, octet de filtre compris)."""
+        pixels = bytearray(self.fond())
+        for rôle, *rectangle in self.rectangles(_état(position)):
+            self._peindre(pixels, *rectangle, COULEURS[rôle])
+        return pixels
+
+    def fond_svg(self):
+        """Éléments SVG du plateau vide."""
+        if self._fond_svg is None:
+            éléments = [_rect_svg(0, 0, self.taille, self.taille, 'fond')]
+            for x in range(1, 10):
+                for y in range(1, 10):
+                    éléments.append(_rect_svg(*self.coin(x, y), self.case, self.case, 'case'))
+            self._fond_svg = ''.join(éléments)
+        return self._fond_svg
+
+    def éléments_svg(self, position):
+        """Éléments SVG de la position, sans l'enveloppe <svg>."""
+        éléments = [self.fond_svg()]
+        for rôle, *rectangle in self.rectangles(_état(position)):
+            éléments.append(_rect_svg(*rectangle, rôle,
+                                      self.case // 4 if rôle != 'mur' else 0))
+        return ''.join(éléments)
+
+
+def _rect_svg(gauche, haut, largeur, hauteur, rôle, arrondi=0):
+    couleur = '#{:02x}{:02x}{:02x}'.format(*COULEURS[rôle])
+    rx = f' rx="{arrondi}"' if arrondi else ''
+    return (f'<rect x="{gauche}" y="{haut}" width="{largeur}" height="{hauteur}"{rx} '
+            f'fill="{couleur}"/>')
+
+
+def _entête_svg(largeur, hauteur):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{largeur}" height="{hauteur}" '
+            f'viewBox="0 0 {largeur} {hauteur}">')
+
+
+def svg(position, gabarit=None):
+    """Document SVG de la position."""
+    gabarit = gabarit or Gabarit()
+    return (_entête_svg(gabarit.taille, gabarit.taille) +
+            gabarit.éléments_svg(position) + '</svg>\n')
+
+
+def _bloc_png(nature, données):
+    return (struct.pack('>I', len(données)) + nature + données +
+            struct.pack('>I', zlib.crc32(nature + données)))
+
+
+def _entête_png(largeur, hauteur):
+    # 8 bits par composante, couleurs RVB, sans entrelacement.
+    return SIGNATURE_PNG + _bloc_png(b'IHDR', struct.pack('>IIBBBBB', largeur, hauteur,
+                                                          8, 2, 0, 0, 0))
+
+
+def encoder_png(pixels, largeur, hauteur):
+    """Fichier PNG de pixels RVB déjà découpés en lignes PNG (octet de filtre compris)."""
+    return (_entête_png(largeur, hauteur) + _bloc_png(b'IDAT', zlib.compress(bytes(pixels), 6)) +
+            _bloc_png(b'IEND', b''))
+
+
+def png(position, gabarit=None):
+    """Fichier PNG de la position."""
+    gabarit = gabarit or Gabarit()
+    return encoder_png(gabarit.pixels(position), gabarit.taille, gabarit.taille)
+
+
+_ARCHIVES = {}
+_GABARITS = {}
+
+
+def _archive(chemin):
+    """ArchiveParties ouverte une fois par processus."""
+    if chemin not in _ARCHIVES:
+        _ARCHIVES[chemin] = ArchiveParties(chemin)
+    return _ARCHIVES[chemin]
+
+
+def _gabarit(case):
+    if case not in _GABARITS:
+        _GABARITS[case] = Gabarit(case)
+    return _GABARITS[case]
+
+
+def _rendre_partie(chemin, numéro, format_, case, dossier):
+    """Images des positions d'une partie: écrites dans dossier, sinon retournées.
+
+    Sans dossier, une image est les pixels (png) ou les éléments (svg) de la
+    position, à placer sur une planche.
+    """
+    gabarit = _gabarit(case)
+    nom = os.path.splitext(os.path.basename(chemin))[0]
+    images = []
+    for pli, q in enumerate(positions(_archive(chemin)[numéro])):
+        if dossier is None:
+            images.append(bytes(gabarit.pixels(q)) if format_ == 'png'
+                          else gabarit.éléments_svg(q))
+            continue
+        if format_ == 'png':
+            contenu, mode = png(q, gabarit), 'wb'
+        else:
+            contenu, mode = svg(q, gabarit), 'w'
+        with open(os.path.join(dossier, f'{nom}_{numéro:05d}_{pli:03d}.{format_}'), mode) as fichier:
+            fichier.write(contenu)
+        images.append(None)
+    return images if dossier is None else len(images)
+
+
+def _rendre_tâche(tâche):
+    return _rendre_partie(*tâche)
+
+
+def _en_ordre(exécuteur, tâches, fenêtre):
+    """Résultats des tâches dans l'ordre, au plus fenêtre tâches soumises à la fois.
+
+    Contrairement à Executor.map, qui soumet tout d'un coup, les images
+    rendues n'attendent pas en mémoire d'être écrites sur la planche.
+    """
+    tâches = iter(tâches)
+    futurs = collections.deque()
+    for tâche in tâches:
+        futurs.append(exécuteur.submit(_rendre_tâche, tâche))
+        if len(futurs) >= fenêtre:
+            break
+    while futurs:
+        résultat = futurs.popleft().result()
+        for tâche in tâches:
+            futurs.append(exécuteur.submit(_rendre_tâche, tâche))
+            break
+        yield résultat
+
+
+def _planche_png(fichier, lots, nombre, colonnes, gabarit):
+    """Écrit la planche en compressant une bande d'images à la fois."""
+    rangées = -(-nombre // colonnes)
+    taille = gabarit.taille
+    fichier.write(_entête_png(taille * colonnes, taille * rangées))
+    compresseur = zlib.compressobj(6)
+    idat = bytearray()
+    vide = bytes(COULEURS['fond']) * taille
+    bande = []
+
+    def vider_bande():
+        for ligne in range(taille):
+            début = ligne * gabarit.ligne + 1
+            morceaux = [image[début:début + 3 * taille] for image in bande]
+            morceaux += [vide] * (colonnes - len(bande))
+            idat.extend(compresseur.compress(b'\x00' + b''.join(morceaux)))
+        bande.clear()
+
+    for images in lots:
+        for image in images:
+            bande.append(image)
+            if len(bande) == colonnes:
+                vider_bande()
+    if bande:
+        vider_bande()
+    idat.extend(compresseur.flush())
+    fichier.write(_bloc_png(b'IDAT', bytes(idat)))
+    fichier.write(_bloc_png(b'IEND', b''))
+
+
+def _planche_svg(fichier, lots, nombre, colonnes, gabarit):
+    """Écrit la planche, chaque image dans un groupe déplacé à sa place."""
+    rangées = -(-nombre // colonnes)
+    fichier.write(_entête_svg(gabarit.taille * colonnes, gabarit.taille * rangées) + '\n')
+    indice = 0
+    for images in lots:
+        for image in images:
+            rangée, colonne = divmod(indice, colonnes)
+            fichier.write(f'<g transform="translate({colonne * gabarit.taille},'
+                          f'{rangée * gabarit.taille})">{image}</g>\n')
+            indice += 1
+    fichier.write('</svg>\n')
+
+
+def rendre_parties(chemins, dossier=None, planche=None, format_='svg', case=40, colonnes=16,
+                   processus=None):
+    """Rend toutes les positions des parties des fichiers chemins.
+
+    Une image par position dans dossier, ou toutes sur la planche (format
+    selon son extension), colonnes images par rangée. Chaque partie est
+    rendue par un processus du groupe, avec quelques parties d'avance par
+    processus au plus. Retourne le nombre d'images.
+    """
+    if (dossier is None) == (planche is None):
+        raise ValueError("Il faut un dossier ou une planche")
+    tâches = []
+    nombre = 0
+    for chemin in chemins:
+        with ArchiveParties(chemin) as archive:
+            for numéro in range(len(archive)):
+                nombre += len(archive[numéro].coups) + 1
+                tâches.append((os.path.abspath(chemin), numéro, format_, case, dossier))
+    if planche is not None:
+        format_ = 'png' if planche.lower().endswith('.png') else 'svg'
+        tâches = [(chemin, numéro, format_, case, None) for chemin, numéro, *_ in tâches]
+    else:
+        os.makedirs(dossier, exist_ok=True)
+    processus = processus or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(processus) as exécuteur:
+        lots = _en_ordre(exécuteur, tâches, 4 * processus)
+        if planche is None:
+            return sum(lots)
+        if format_ == 'png':
+            with open(planche, 'wb') as fichier:
+                _planche_png(fichier, lots, nombre, colonnes, _gabarit(case))
+        else:
+            with open(planche, 'w', encoding='utf-8') as fichier:
+                _planche_svg(fichier, lots, nombre, colonnes, _gabarit(case))
+    return nombre
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Images des positions de parties enregistrées")
+
+    parser.add_argument("parties", nargs="+", help="Fichiers de parties (module enregistrement)")
+
+    parser.add_argument("-o", "--dossier", default=None, help="Dossier des images, une par position")
+
+    parser.add_argument("--planche", default=None,
+                        help="Fichier .png ou .svg avec toutes les positions")
+
+    parser.add_argument("--format", dest="format_", choices=("svg", "png"), default="svg",
+                        help="Format des images du dossier")
+
+    parser.add_argument("--case", type=int, default=40, help="Côté d'une case en pixels")
+
+    parser.add_argument("--colonnes", type=int, default=16, help="Images par rangée de la planche")
+
+    parser.add_argument("-p", "--processus", type=int, default=None,
+                        help="Nombre de processus (par défaut, un par coeur)")
+
+    return parser.parse_args()
+
+
+def main():
+    """Rend les parties demandées."""
+    args = analyser_commande()
+    if args.dossier is None and args.planche is None:
+        args.dossier = "images"
+    nombre = rendre_parties(args.parties, args.dossier, args.planche, args.format_, args.case,
+                            args.colonnes, args.processus)
+    print(f"{nombre} images dans {args.planche or args.dossier}")
+
+
+if __name__ == "__main__":
+    main()
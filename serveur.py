@@ -0,0 +1,170 @@
+"""Quoridor - module serveur
+
+Serveur local qui imite les points d'accès lister/, débuter/ et jouer/ du
+serveur du cours, avec les mêmes réponses JSON (id, état, message). La
+classe Quoridor sert d'arbitre; l'adversaire est une stratégie du module
+tournoi.
+
+    python serveur.py --port 8000 --adversaire alphabeta:temps_max=0.1
+    python main.py -a --url http://127.0.0.1:8000/quoridor/api/ idul
+"""
+
+import argparse
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+import uuid
+
+from quoridor import Quoridor, QuoridorError
+from tournoi import STRATÉGIES, analyser_stratégie
+
+
+class Partie:
+    """
+    Partie en cours sur le serveur: l'arbitre et un verrou pour les requêtes
+    """
+    def __init__(self, id_partie, idul):
+        self.id = id_partie
+        self.idul = idul
+        self.date = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.q = Quoridor([idul, 'automate'])
+        self.verrou = threading.Lock()
+
+
+class ServeurQuoridor(http.server.ThreadingHTTPServer):
+    """
+    Serveur HTTP multifil qui garde les parties en mémoire
+    """
+    daemon_threads = True
+
+    def __init__(self, adresse, adversaire='heuristique'):
+        super().__init__(adresse, GestionnaireQuoridor)
+        self.adversaire = analyser_stratégie(adversaire)
+        self.parties = {}
+        self.verrou = threading.Lock()
+
+    def lister(self, idul):
+        """Les 20 dernières parties du joueur."""
+        with self.verrou:
+            parties = [partie for partie in self.parties.values() if partie.idul == idul]
+        return {'parties': [{'id': partie.id, 'date': partie.date}
+                            for partie in parties[-20:]]}
+
+    def débuter(self, idul):
+        """Crée une partie; le joueur 1 commence."""
+        partie = Partie(str(uuid.uuid4()), idul)
+        with self.verrou:
+            self.parties[partie.id] = partie
+        return {'id': partie.id, 'état': partie.q.état_partie()}
+
+    def jouer(self, id_partie, type_coup, position):
+        """Joue le coup du joueur 1 puis, si la partie continue, celui de l'adversaire."""
+        partie = self.parties.get(id_partie)
+        if partie is None:
+            return {'message': f"La partie {id_partie} n'existe pas."}
+        with partie.verrou:
+            q = partie.q
+            if q.partie_terminée():
+                return {'message': "La partie est déjà terminée."}
+            try:
+                q.jouer(1, (type_coup, *position))
+            except (QuoridorError, ValueError) as erreur:
+                return {'message': str(erreur)}
+            if not q.partie_terminée():
+                nom, paramètres = self.adversaire
+                STRATÉGIES[nom](q, 2, **paramètres)
+            return {'id': partie.id, 'état': q.état_partie()}
+
+
+def lire_position(valeurs):
+    """Position (x, y) d'un formulaire: pos=x&pos=y ou pos=(x, y)."""
+    if len(valeurs) == 1:
+        valeurs = valeurs[0].strip('()[] ').split(',')
+    x, y = (int(valeur) for valeur in valeurs)
+    return x, y
+
+
+class GestionnaireQuoridor(http.server.BaseHTTPRequestHandler):
+    """
+    Traite une requête; le point d'accès est le dernier segment du chemin
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _point_accès(self):
+        chemin = urllib.parse.urlsplit(self.path).path
+        return urllib.parse.unquote(chemin).rstrip('/').rsplit('/', 1)[-1]
+
+    def _formulaire(self):
+        longueur = int(self.headers.get('Content-Length', 0))
+        corps = self.rfile.read(longueur).decode('utf-8')
+        return urllib.parse.parse_qs(corps)
+
+    def _répondre(self, contenu, code=200):
+        corps = json.dumps(contenu).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        """lister/?idul=..."""
+        if self._point_accès() != 'lister':
+            self._répondre({'message': "Point d'accès inconnu."}, 404)
+            return
+        requête = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        self._répondre(self.server.lister(requête.get('idul', [''])[0]))
+
+    def do_POST(self):
+        """débuter/ (idul) et jouer/ (id, type, pos)."""
+        point_accès = self._point_accès()
+        formulaire = self._formulaire()
+        if point_accès == 'débuter':
+            self._répondre(self.server.débuter(formulaire.get('idul', [''])[0]))
+        elif point_accès == 'jouer':
+            try:
+                position = lire_position(formulaire['pos'])
+                id_partie = formulaire['id'][0]
+                type_coup = formulaire['type'][0]
+            except (KeyError, ValueError):
+                self._répondre({'message': "Requête invalide: id, type et pos sont requis."})
+                return
+            self._répondre(self.server.jouer(id_partie, type_coup, position))
+        else:
+            self._répondre({'message': "Point d'accès inconnu."}, 404)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Pas de journal: le serveur sert aux mesures de charge."""
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Serveur Quoridor local")
+
+    parser.add_argument("--hôte", default="127.0.0.1", help="Adresse d'écoute")
+
+    parser.add_argument("--port", type=int, default=8000, help="Port d'écoute")
+
+    parser.add_argument("--adversaire", default="heuristique",
+                        help="Stratégie de l'adversaire, par exemple alphabeta:temps_max=0.1")
+
+    return parser.parse_args()
+
+
+def main():
+    """Lance le serveur jusqu'à Ctrl-C."""
+    args = analyser_commande()
+    serveur = ServeurQuoridor((args.hôte, args.port), args.adversaire)
+    print(f"http://{args.hôte}:{args.port}/quoridor/api/")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
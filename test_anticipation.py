@@ -0,0 +1,50 @@
+"""Tests du module anticipation et du coup prévu de chercher_coup"""
+
+import time
+
+from anticipation import Anticipation
+from plateau import coup
+from quoridor import Quoridor
+from recherche import Recherche
+
+
+def test_réplique_préparée():
+    q = Quoridor(['a', 'b'])
+    q.jouer_coup(1, profondeur=2)
+    anticipation = Anticipation(réponses=2)
+    anticipation.démarrer(q.état)
+    time.sleep(0.3)
+    position = q.état.copie()
+    position.appliquer(Recherche().coups(position)[0])
+    prévu = anticipation.réplique(position)
+    assert prévu is not None
+    code, profondeur, temps = prévu
+    assert coup(code) in set(Quoridor(**position.vers_dict()).coups_légaux(1))
+    assert profondeur >= 1 and temps > 0
+
+
+def test_réplique_inconnue():
+    q = Quoridor(['a', 'b'])
+    anticipation = Anticipation()
+    anticipation.démarrer(q.état.copie(trait=1))
+    assert anticipation.réplique(q.état) is None
+
+
+def test_prévu_assez_cherché_joué_tout_de_suite():
+    q = Quoridor(['a', 'b'])
+    code = Recherche().coups(q.état)[1]
+    début = time.perf_counter()
+    assert q.chercher_coup(1, temps_max=0.5, prévu=(code, 3, 0.5)) == coup(code)
+    assert time.perf_counter() - début < 0.1
+    assert q.dernière_recherche['anticipé']
+
+
+def test_prévu_reprend_avec_le_temps_restant():
+    q = Quoridor(['a', 'b'])
+    code = Recherche().coups(q.état)[0]
+    début = time.perf_counter()
+    q.chercher_coup(1, temps_max=0.5, prévu=(code, 2, 0.4))
+    durée = time.perf_counter() - début
+    assert durée < 0.3
+    assert q.dernière_recherche['profondeur'] >= 2
+
@@ -0,0 +1,57 @@
+"""Tests des relances du client HTTP (api)."""
+
+import http.server
+import threading
+
+import pytest
+
+from api import ClientQuoridor
+
+
+class GestionnaireEnPanne(http.server.BaseHTTPRequestHandler):
+    """Répond 503 à tout et compte les requêtes par méthode."""
+    protocol_version = 'HTTP/1.1'
+
+    def _répondre(self):
+        self.server.requêtes[self.command] += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_POST = _répondre
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Pas de journal."""
+
+
+@pytest.fixture
+def serveur_en_panne():
+    serveur = http.server.ThreadingHTTPServer(('127.0.0.1', 0), GestionnaireEnPanne)
+    serveur.requêtes = {'GET': 0, 'POST': 0}
+    fil = threading.Thread(target=serveur.serve_forever, daemon=True)
+    fil.start()
+    yield serveur
+    serveur.shutdown()
+    serveur.server_close()
+
+
+def _client(serveur):
+    return ClientQuoridor(f"http://127.0.0.1:{serveur.server_address[1]}/", essais=2, attente=0)
+
+
+def test_post_jamais_relancé(serveur_en_panne):
+    with _client(serveur_en_panne) as client:
+        with pytest.raises(RuntimeError, match="503"):
+            client.jouer_coup('partie', 'D', (5, 2))
+        with pytest.raises(RuntimeError, match="503"):
+            client.débuter_partie('idul')
+    assert serveur_en_panne.requêtes['POST'] == 2
+    assert len(client.latences['jouer/']) == 1
+
+
+def test_get_relancé(serveur_en_panne):
+    with _client(serveur_en_panne) as client:
+        with pytest.raises(RuntimeError, match="503"):
+            client.lister_parties('idul')
+    assert serveur_en_panne.requêtes['GET'] == 3
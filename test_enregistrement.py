@@ -0,0 +1,36 @@
+"""Tests du format binaire des parties (enregistrement)."""
+
+import pytest
+
+from enregistrement import (ArchiveParties, ÉcrivainParties, _décoder, _encoder,
+                            lire_parties)
+
+
+@pytest.mark.parametrize('nom', ['é' * 200, 'a' + 'é' * 200, '🎲' * 70, 'x' * 300])
+def test_nom_coupé_sans_couper_un_caractère(nom):
+    partie, fin = _décoder(_encoder([nom, 'b'], [4, 76], 1), 0)
+    octets = partie.noms[0].encode('utf-8')
+    assert len(octets) <= 255
+    assert nom.startswith(partie.noms[0])
+    assert len(octets) > 255 - 4
+    assert partie.noms[1] == 'b'
+    assert partie.gagnant == 1 and partie.coups == bytes([4, 76])
+    assert fin == len(_encoder([nom, 'b'], [4, 76], 1))
+
+
+def test_nom_court_inchangé():
+    partie, _ = _décoder(_encoder(['Hélène', 'ñandú'], [], None), 0)
+    assert partie.noms == ('Hélène', 'ñandú')
+    assert partie.gagnant is None
+
+
+def test_fichier_relu(tmp_path):
+    chemin = str(tmp_path / 'parties.qrd')
+    with ÉcrivainParties(chemin) as écrivain:
+        écrivain.écrire(['é' * 200, 'b'], [4, 76], 2)
+        écrivain.écrire(['a', 'b'], [13], None)
+    parties = list(lire_parties(chemin))
+    assert [partie.coups for partie in parties] == [bytes([4, 76]), bytes([13])]
+    with ArchiveParties(chemin) as archive:
+        assert len(archive) == 2
+        assert archive[0] == parties[0] and archive[-1] == parties[1]
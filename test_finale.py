@@ -0,0 +1,45 @@
+"""Tests du module finale"""
+
+import sys
+import threading
+
+import finale
+from plateau import emplacement
+
+
+def _murs(nombre):
+    """Masque de murs horizontaux sur la rangée 5, un seul par configuration."""
+    return 1 << emplacement('horizontal', (1 + nombre % 8, 5))
+
+
+def test_table_gardée_en_cache():
+    murs = _murs(3)
+    assert finale.table(murs) is finale.table(murs)
+    assert finale.table(murs, calculer=False) is finale.table(murs)
+
+
+def test_table_partagée_entre_fils(monkeypatch):
+    """Éviction et mises à jour concurrentes: ni KeyError ni RuntimeError."""
+    monkeypatch.setattr(finale, 'CAPACITÉ_TABLES', 2)
+    erreurs = []
+
+    def travailler(décalage):
+        try:
+            for i in range(12):
+                murs = _murs(i + décalage)
+                finale.table(murs, calculer=(i % 3 != 0))
+        except Exception as erreur:  # pylint: disable=broad-except
+            erreurs.append(erreur)
+
+    intervalle = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        fils = [threading.Thread(target=travailler, args=(décalage,)) for décalage in range(3)]
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+    finally:
+        sys.setswitchinterval(intervalle)
+    assert not erreurs
+    assert len(finale._TABLES) <= 2
@@ -0,0 +1,50 @@
+"""Tests du module instrumentation"""
+
+import pytest
+
+from instrumentation import INSTRUMENTS
+from quoridor import Quoridor, QuoridorError
+
+
+@pytest.fixture
+def instruments():
+    """INSTRUMENTS vidés, désactivés à la fin du test."""
+    INSTRUMENTS.vider()
+    yield INSTRUMENTS
+    INSTRUMENTS.désactiver()
+    INSTRUMENTS.vider()
+
+
+def test_fonction_d_origine_si_inactif(instruments):
+    assert not hasattr(Quoridor.placer_mur, '__wrapped__')
+    instruments.activer()
+    assert Quoridor.placer_mur.__wrapped__.__name__ == 'placer_mur'
+    instruments.désactiver()
+    assert not hasattr(Quoridor.placer_mur, '__wrapped__')
+
+
+def test_mesures_si_actif(instruments):
+    instruments.activer()
+    reçus = []
+
+    def abonné(nom, _):
+        reçus.append(nom)
+
+    instruments.abonner('placer_mur', abonné)
+    try:
+        q = Quoridor(['a', 'b'])
+        q.placer_mur(1, (4, 5), 'horizontal')
+        with pytest.raises(QuoridorError):
+            q.placer_mur(1, (4, 5), 'horizontal')
+    finally:
+        instruments.désabonner('placer_mur', abonné)
+    profil = instruments.profil()
+    assert profil['durées']['placer_mur']['appels'] == 2
+    assert profil['compteurs']['placer_mur.erreurs'] == 1
+    assert reçus == ['placer_mur', 'placer_mur']
+
+
+def test_rien_mesuré_si_inactif(instruments):
+    q = Quoridor(['a', 'b'])
+    q.placer_mur(1, (4, 5), 'horizontal')
+    assert instruments.profil()['durées'] == {}
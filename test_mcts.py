@@ -0,0 +1,36 @@
+"""Tests du module mcts"""
+
+import random
+
+import pytest
+
+import mcts
+
+
+@pytest.mark.parametrize('trait', [0, 1])
+def test_favori_pion_bloqué(partie_bloquée, trait):
+    assert mcts._favori(partie_bloquée.état.copie(trait=trait)) in (0, 1)
+
+
+def test_coup_simulation_pion_bloqué(partie_bloquée):
+    position = partie_bloquée.état.copie(trait=0)
+    légaux = set(position.coups_légaux())
+    hasard = random.Random(0)
+    for _ in range(20):
+        assert mcts._coup_simulation(position, hasard) in légaux
+
+
+def test_simuler_remet_la_position(partie_bloquée):
+    position = partie_bloquée.état.copie(trait=0)
+    avant = position.compact()
+    hasard = random.Random(1)
+    for _ in range(20):
+        assert mcts.simuler(position, hasard) in (0, 1)
+    assert position.compact() == avant
+
+
+@pytest.mark.parametrize('fixture', ['partie_bloquée', 'partie_près_du_blocage'])
+def test_jouer_coup_mcts_pion_bloqué(request, fixture):
+    partie = request.getfixturevalue(fixture)
+    légaux = set(partie.coups_légaux(1))
+    assert partie.jouer_coup_mcts(1, temps_max=0.2, processus=1) in légaux
@@ -0,0 +1,61 @@
+"""Tests du module parties, contre le serveur local (serveur.py)"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+
+import pytest
+
+import parties
+from api_async import ClientQuoridorAsync
+from serveur import ServeurQuoridor
+
+
+@pytest.fixture
+def url_serveur():
+    """Adresse d'un serveur local lancé dans un fil pour la durée du test."""
+    serveur = ServeurQuoridor(('127.0.0.1', 0))
+    fil = threading.Thread(target=serveur.serve_forever, daemon=True)
+    fil.start()
+    yield f"http://127.0.0.1:{serveur.server_address[1]}/"
+    serveur.shutdown()
+    serveur.server_close()
+
+
+async def _jouer(url, nombre):
+    async with ClientQuoridorAsync(url) as client:
+        # Des fils plutôt que des processus: le moteur remplacé par le test
+        # est celui qu'appellent les parties.
+        with concurrent.futures.ThreadPoolExecutor(nombre) as exécuteur:
+            return await asyncio.gather(*(parties.jouer_partie(client, 'idul', exécuteur, 0.02)
+                                          for _ in range(nombre)))
+
+
+def test_parties_terminées(url_serveur):
+    for id_partie, gagnant, coups, erreur in asyncio.run(_jouer(url_serveur, 2)):
+        assert id_partie and erreur is None
+        assert gagnant in ('idul', 'automate') and coups > 0
+
+
+def test_erreur_du_moteur_n_arrête_que_sa_partie(url_serveur, monkeypatch):
+    choisir_coup = parties.choisir_coup
+    appels = itertools.count()
+
+    def moteur_fautif(état, temps_max):
+        if next(appels) == 0:
+            raise TypeError("moteur en panne")
+        return choisir_coup(état, temps_max)
+
+    monkeypatch.setattr(parties, 'choisir_coup', moteur_fautif)
+    résultats = asyncio.run(_jouer(url_serveur, 2))
+    erreurs = [erreur for _, _, _, erreur in résultats if erreur is not None]
+    assert erreurs == ["TypeError: moteur en panne"]
+    assert sum(gagnant is not None for _, gagnant, _, _ in résultats) == 1
+
+
+def test_serveur_injoignable():
+    résultats = asyncio.run(_jouer("http://127.0.0.1:9/", 1))
+    (id_partie, gagnant, coups, erreur), = résultats
+    assert id_partie is None and gagnant is None and coups == 0
+    assert erreur
@@ -0,0 +1,145 @@
+"""Tests du module plateau, comparé au graphe networkx de référence"""
+
+import random
+import sys
+import threading
+
+import networkx as nx
+import pytest
+
+from plateau import CACHE, NB_EMPLACEMENTS, CacheDistances, OBJECTIFS, bits, mur, position
+from quoridor import Quoridor, arêtes_mur, construire_graphe, graphe_helper
+
+
+def test_évaluer_murs_pion_bloqué(partie_bloquée):
+    """Tous les murs légaux sont évalués, avec des distances définies."""
+    état = partie_bloquée.état
+    plateau = état.plateau
+    évalués = plateau.évaluer_murs(*état.pions)
+    assert {numéro for numéro, _, _ in évalués} == set(bits(plateau.murs_légaux(*état.pions)))
+    for numéro, *distances in évalués:
+        plateau.ajouter_mur(numéro)
+        for i in range(2):
+            assert distances[i] == plateau.distance_course(état.pions[i], état.pions[1 - i],
+                                                           OBJECTIFS[i])
+        plateau.retirer_mur(numéro)
+
+
+def _conflit(orientation, position, murh, murv):
+    """Vrai si le mur chevauche ou croise un mur posé (règles du jeu)."""
+    x, y = position
+    if orientation == 'horizontal':
+        return (any(mx in (x - 1, x, x + 1) and my == y for mx, my in murh) or
+                (x + 1, y - 1) in murv)
+    return (any(mx == x and my in (y - 1, y, y + 1) for mx, my in murv) or
+            (x - 1, y + 1) in murh)
+
+
+def _murs_légaux_référence(q):
+    """Masque des murs légaux d'après le graphe networkx sans les pions."""
+    graphe = graphe_helper(q.murh, q.murv)
+    for x in range(1, 10):
+        graphe.add_edge((x, 9), 'B1')
+        graphe.add_edge((x, 1), 'B2')
+    pions = [joueur['pos'] for joueur in q.joueurs]
+    légaux = 0
+    for numéro in range(NB_EMPLACEMENTS):
+        orientation, position_mur = mur(numéro)
+        if _conflit(orientation, position_mur, q.murh, q.murv):
+            continue
+        arêtes = arêtes_mur(orientation, position_mur)
+        graphe.remove_edges_from(arêtes)
+        if all(nx.has_path(graphe, pions[i], ('B1', 'B2')[i]) for i in range(2)):
+            légaux |= 1 << numéro
+        graphe.add_edges_from(arêtes)
+    return légaux
+
+
+def _comparer(q):
+    """Compare le plateau de q au graphe de construire_graphe."""
+    état = q.état
+    plateau = état.plateau
+    pions = [joueur['pos'] for joueur in q.joueurs]
+    graphe = construire_graphe(pions, q.murh, q.murv)
+    cartes = CACHE.cartes(plateau)
+    for i in range(2):
+        pion, autre = état.pions[i], état.pions[1 - i]
+        attendus = {voisin for voisin in graphe.successors(pions[i]) if isinstance(voisin, tuple)}
+        assert {position(c) for c in bits(plateau.coups_pion(pion, autre))} == attendus
+        try:
+            attendue = len(nx.shortest_path(graphe, pions[i], ('B1', 'B2')[i])) - 2
+        except nx.NetworkXNoPath:
+            attendue = None
+        assert plateau.distance_pion(pion, autre, OBJECTIFS[i]) == attendue
+        assert plateau.distance_pion(pion, autre, OBJECTIFS[i], cartes[i]) == attendue
+    assert plateau.murs_légaux(*état.pions) == _murs_légaux_référence(q)
+
+
+def _parties_aléatoires(nombre, coups_max=60):
+    """Parties au hasard, les déplacements plus souvent que les murs; une par position."""
+    hasard = random.Random(2024)
+    for _ in range(nombre):
+        q = Quoridor(['a', 'b'])
+        joueur = 1
+        for _ in range(coups_max):
+            yield q
+            if q.partie_terminée():
+                break
+            coups = list(q.coups_légaux(joueur))
+            déplacements = [coup for coup in coups if coup[0] == 'D']
+            q.jouer(joueur, hasard.choice(déplacements if hasard.random() < 0.6 else coups))
+            joueur = 3 - joueur
+
+
+def test_comparaison_parties_aléatoires():
+    positions = 0
+    for q in _parties_aléatoires(6):
+        _comparer(q)
+        positions += 1
+    assert positions > 100
+
+
+@pytest.mark.parametrize('fixture', ['partie_bloquée', 'partie_près_du_blocage',
+                                     'partie_bloquée_avec_murs'])
+def test_comparaison_pions_bloqués(request, fixture):
+    partie = request.getfixturevalue(fixture)
+    _comparer(partie)
+    # Et quelques coups plus loin, pions bloqués ou non.
+    hasard = random.Random(7)
+    joueur = 1
+    for _ in range(30):
+        if partie.partie_terminée():
+            break
+        partie.jouer(joueur, hasard.choice(list(partie.coups_légaux(joueur))))
+        joueur = 3 - joueur
+        _comparer(partie)
+
+
+def test_cache_distances_partagé_entre_fils():
+    """Petit cache partagé: évictions concurrentes sans erreur, cartes exactes."""
+    plateaux = [q.état.plateau.copie() for q in _parties_aléatoires(2, coups_max=30)]
+    cache = CacheDistances(capacité=4)
+    erreurs = []
+
+    def travailler(décalage):
+        try:
+            for plateau in plateaux[décalage:] + plateaux[:décalage]:
+                for joueur in range(2):
+                    carte = cache.carte(plateau, joueur, calculer=(décalage != 1))
+                    if carte is not None:
+                        assert carte == plateau.distances(OBJECTIFS[joueur])
+        except Exception as erreur:  # pylint: disable=broad-except
+            erreurs.append(erreur)
+
+    intervalle = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        fils = [threading.Thread(target=travailler, args=(décalage,)) for décalage in range(3)]
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+    finally:
+        sys.setswitchinterval(intervalle)
+    assert not erreurs
+    assert len(cache.entrées) <= 4
@@ -0,0 +1,67 @@
+"""Tests du module quoridor"""
+
+import io
+import random
+
+import pytest
+
+from plateau import OBJECTIFS
+from quoridor import Quoridor
+
+
+def test_plateau_ascii_suit_les_coups():
+    q = Quoridor(['a', 'b'])
+    avant = q.plateau_ascii()
+    assert isinstance(avant, bytes)
+    q.jouer(1, ('MH', 4, 5))
+    après = q.plateau_ascii()
+    assert après != avant and b'-------' in après
+    assert str(q) == "légende: 1=a 2=b\n" + après.decode('ascii')
+
+
+def test_écrire_ascii():
+    q = Quoridor(['a', 'b'])
+    binaire = io.BytesIO()
+    texte = io.StringIO()
+    q.écrire_ascii(binaire)
+    q.écrire_ascii(texte)
+    assert binaire.getvalue().decode('utf-8') == texte.getvalue() == str(q)
+
+
+def test_jouer_coup_heuristique_pion_bloqué(partie_bloquée_avec_murs):
+    """Les deux joueurs ont un mur: la finale ne répond pas."""
+    random.seed(0)
+    for joueur in (1, 2):
+        for _ in range(10):
+            partie = Quoridor(**partie_bloquée_avec_murs.état_partie())
+            légaux = set(partie.coups_légaux(joueur))
+            assert partie.jouer_coup(joueur) in légaux
+
+
+def test_chemin_course_pion_bloqué(partie_bloquée):
+    chemin = partie_bloquée.chemin_course(1)
+    assert chemin[0] == (9, 8) and chemin[-1][1] == 9
+    assert len(chemin) - 1 == partie_bloquée.plateau.distance(partie_bloquée.état.pions[0],
+                                                              OBJECTIFS[0])
+
+
+def test_vues_en_lecture_seule():
+    q = Quoridor(['a', 'b'])
+    with pytest.raises(AttributeError):
+        q.murh.append((4, 5))
+    with pytest.raises(TypeError):
+        q.joueurs[0]['pos'] = (1, 1)
+    with pytest.raises(AttributeError):
+        q.murv = []
+
+
+def test_vues_suivent_l_état():
+    q = Quoridor(['a', 'b'])
+    joueurs = q.joueurs
+    assert q.joueurs is joueurs
+    q.jouer(1, ('MV', 4, 5))
+    assert q.joueurs is not joueurs
+    assert q.murv == ((4, 5),) and q.murh == ()
+    assert q.joueurs[0]['murs'] == 9
+    q.jouer(2, ('D', 5, 8))
+    assert q.joueurs[1]['pos'] == (5, 8)
@@ -0,0 +1,39 @@
+"""Tests du module recherche"""
+
+import pytest
+
+from plateau import OBJECTIFS
+from recherche import Recherche
+
+
+def test_distance_pion_bloqué(partie_bloquée):
+    état = partie_bloquée.état
+    plateau = état.plateau
+    assert plateau.distance_pion(état.pions[0], état.pions[1], OBJECTIFS[0]) is None
+    assert plateau.distance_course(état.pions[0], état.pions[1], OBJECTIFS[0]) == \
+        plateau.distance(état.pions[0], OBJECTIFS[0])
+
+
+@pytest.mark.parametrize('trait', [0, 1])
+def test_évaluer_pion_bloqué(partie_bloquée, trait):
+    assert isinstance(Recherche().évaluer(partie_bloquée.état.copie(trait=trait)), int)
+
+
+def test_coups_pion_bloqué(partie_bloquée):
+    """Sans pas qui rapproche, les déplacements permis restent proposés."""
+    légaux = set(partie_bloquée.état.coups_légaux(0))
+    coups = Recherche().coups(partie_bloquée.état.copie(trait=0))
+    assert coups and set(coups) <= légaux
+
+
+@pytest.mark.parametrize('fixture', ['partie_bloquée', 'partie_près_du_blocage'])
+def test_chercher_coup_pion_bloqué(request, fixture):
+    partie = request.getfixturevalue(fixture)
+    assert partie.chercher_coup(1, profondeur=4) in set(partie.coups_légaux(1))
+
+
+@pytest.mark.parametrize('fixture', ['partie_bloquée', 'partie_près_du_blocage'])
+def test_jouer_coup_temps_pion_bloqué(request, fixture):
+    partie = request.getfixturevalue(fixture)
+    légaux = set(partie.coups_légaux(1))
+    assert partie.jouer_coup(1, temps_max=0.3) in légaux
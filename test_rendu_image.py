@@ -0,0 +1,54 @@
+"""Tests du rendu par lots (rendu_image)."""
+
+import concurrent.futures
+import os
+
+import rendu_image
+from enregistrement import ÉcrivainParties
+
+
+class ExécuteurCompteur:
+    """Exécuteur synchrone qui compte les tâches soumises et pas encore lues."""
+    def __init__(self):
+        self.en_vol = 0
+        self.maximum = 0
+
+    def submit(self, fonction, *args):
+        futur = concurrent.futures.Future()
+        futur.set_result(fonction(*args))
+        self.en_vol += 1
+        self.maximum = max(self.maximum, self.en_vol)
+        lire = futur.result
+
+        def résultat():
+            self.en_vol -= 1
+            return lire()
+        futur.result = résultat
+        return futur
+
+
+def test_en_ordre_borné(monkeypatch):
+    monkeypatch.setattr(rendu_image, '_rendre_tâche', lambda tâche: tâche * 10)
+    exécuteur = ExécuteurCompteur()
+    résultats = []
+    for résultat in rendu_image._en_ordre(exécuteur, range(50), 4):
+        assert exécuteur.en_vol <= 4
+        résultats.append(résultat)
+    assert résultats == [tâche * 10 for tâche in range(50)]
+    assert exécuteur.maximum == 4
+
+
+def test_en_ordre_moins_de_tâches_que_la_fenêtre(monkeypatch):
+    monkeypatch.setattr(rendu_image, '_rendre_tâche', lambda tâche: tâche)
+    assert list(rendu_image._en_ordre(ExécuteurCompteur(), [3, 1], 8)) == [3, 1]
+    assert not list(rendu_image._en_ordre(ExécuteurCompteur(), [], 8))
+
+
+def test_rendre_parties(tmp_path):
+    chemin = str(tmp_path / 'parties.qrd')
+    with ÉcrivainParties(chemin) as écrivain:
+        écrivain.écrire(['a', 'b'], [13, 67], None)
+        écrivain.écrire(['c', 'd'], [13], None)
+    dossier = str(tmp_path / 'images')
+    assert rendu_image.rendre_parties([chemin], dossier=dossier, processus=1) == 5
+    assert len(os.listdir(dossier)) == 5
@@ -0,0 +1,20 @@
+"""Tests du tournoi entre stratégies (tournoi)."""
+
+import io
+
+from tournoi import jouer_partie, tournoi
+
+
+def test_gagnant_est_un_numéro_de_joueur():
+    résultat, joués = jouer_partie(0, ('heuristique', 'heuristique'), 1)
+    assert résultat['gagnant'] in (1, 2)
+    assert résultat['coups'] == len(joués)
+
+
+def test_victoires_par_côté_avec_la_même_stratégie():
+    fichier = io.StringIO()
+    totaux = tournoi('heuristique', 'heuristique', 4, fichier, processus=1, graine=3)
+    assert totaux['stratégies'] == {'A': 'heuristique', 'B': 'heuristique'}
+    assert set(totaux['victoires']) == {'A', 'B'}
+    assert sum(totaux['victoires'].values()) + totaux['nulles'] == 4
+    assert len(fichier.getvalue().splitlines()) == 4
@@ -0,0 +1,216 @@
+"""Quoridor - module tournoi
+
+Parties entre stratégies, sans affichage ni réseau, réparties sur une
+réserve de processus. Chaque partie terminée est ajoutée à un fichier JSON
+lines dès qu'elle se termine.
+
+    python tournoi.py alphabeta:profondeur=2 heuristique -n 100 -o parties.jsonl
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import time
+
+from enregistrement import ÉcrivainParties
+from instrumentation import INSTRUMENTS
+from plateau import code_coup
+from quoridor import Quoridor
+
+
+def jouer_heuristique(q, joueur):
+    """Stratégie d'origine de jouer_coup: plus court chemin ou mur."""
+    return q.jouer_coup(joueur)
+
+
+def jouer_alphabeta(q, joueur, profondeur=None, noeuds_max=None, temps_max=None):
+    """Recherche alpha-bêta (profondeur 3 par défaut)."""
+    if profondeur is None and noeuds_max is None and temps_max is None:
+        profondeur = 3
+    return q.jouer_coup(joueur, profondeur, noeuds_max, temps_max)
+
+
+def jouer_mcts(q, joueur, temps_max=0.5):
+    """Recherche Monte-Carlo sur un seul processus."""
+    return q.jouer_coup_mcts(joueur, temps_max, processus=1)
+
+
+def jouer_aléatoire(q, joueur):
+    """Coup légal tiré au hasard."""
+    return q.jouer(joueur, random.choice(list(q.coups_légaux(joueur))))
+
+
+STRATÉGIES = {
+    'heuristique': jouer_heuristique,
+    'alphabeta': jouer_alphabeta,
+    'mcts': jouer_mcts,
+    'aléatoire': jouer_aléatoire,
+}
+
+
+def analyser_stratégie(description):
+    """Sépare 'nom:clé=valeur,...' en (nom, paramètres)."""
+    nom, _, reste = description.partition(':')
+    if nom not in STRATÉGIES:
+        raise ValueError(f"stratégie inconnue: {nom}")
+    paramètres = {}
+    for paire in filter(None, reste.split(',')):
+        clé, _, valeur = paire.partition('=')
+        paramètres[clé] = float(valeur) if '.' in valeur else int(valeur)
+    return nom, paramètres
+
+
+def charger_livre(chemin):
+    """Donne le livre d'ouvertures à Quoridor dans ce processus."""
+    from livre import Livre
+    Quoridor.livre = Livre(chemin)
+
+
+def jouer_partie(numéro, descriptions, graine, coups_max=200, profils=None):
+    """Joue une partie entre deux stratégies; retourne son résumé et ses coups.
+
+    descriptions donne la stratégie des joueurs 1 et 2. Le gagnant vaut 1,
+    2 ou None si la partie dépasse coups_max coups. Les coups sont leurs
+    codes (plateau.code_coup). Avec profils (un dossier), le profil de la
+    partie, coup par coup, y est écrit.
+    """
+    random.seed(graine)
+    if profils:
+        INSTRUMENTS.vider()
+        INSTRUMENTS.activer()
+    stratégies = [analyser_stratégie(description) for description in descriptions]
+    q = Quoridor(['1', '2'])
+    temps = [0.0, 0.0]
+    coups = [0, 0]
+    joueur = 1
+    joués = []
+    début = time.perf_counter()
+    while not q.partie_terminée() and sum(coups) < coups_max:
+        nom, paramètres = stratégies[(joueur - 1)]
+        départ = time.perf_counter()
+        type_coup, x, y = STRATÉGIES[nom](q, joueur, **paramètres)
+        joués.append(code_coup(type_coup, (x, y)))
+        temps[(joueur - 1)] += time.perf_counter() - départ
+        coups[(joueur - 1)] += 1
+        if profils:
+            INSTRUMENTS.marquer(f"{sum(coups)}: joueur {joueur}")
+        joueur = 3 - joueur
+    # Indice (0 ou 1) du gagnant, qui ne dépend pas des noms des joueurs.
+    gagnant = q.état.gagnant()
+    if profils:
+        INSTRUMENTS.désactiver()
+        INSTRUMENTS.écrire_profil(os.path.join(profils, f"partie_{numéro}.json"),
+                                  partie=numéro, joueurs=list(descriptions))
+    return {'partie': numéro,
+            'joueurs': list(descriptions),
+            'gagnant': gagnant + 1 if gagnant is not None else None,
+            'coups': sum(coups),
+            'temps_par_coup': [temps[i] / coups[i] if coups[i] else 0.0 for i in range(2)],
+            'durée': time.perf_counter() - début}, joués
+
+
+def tournoi(stratégie_a, stratégie_b, parties, fichier, processus=None, graine=0,
+            coups_max=200, profils=None, enregistrement=None, livre=None):
+    """Joue les parties en alternant les couleurs et retourne les totaux.
+
+    Les victoires sont comptées par côté, 'A' et 'B', et non par stratégie:
+    les deux côtés peuvent avoir la même description. A joue en premier
+    dans les parties paires.
+    Chaque résultat est écrit (une ligne JSON) dans fichier dès sa réception,
+    et la partie est ajoutée à enregistrement (un ÉcrivainParties) s'il est donné.
+    Avec livre (un chemin), chaque processus ouvre ce livre d'ouvertures.
+    """
+    hasard = random.Random(graine)
+    totaux = {'A': 0, 'B': 0, None: 0}
+    début = time.perf_counter()
+    initialisation = (charger_livre, (livre,)) if livre else (None, ())
+    with concurrent.futures.ProcessPoolExecutor(processus or os.cpu_count(),
+                                                initializer=initialisation[0],
+                                                initargs=initialisation[1]) as exécuteur:
+        futurs = []
+        for numéro in range(parties):
+            descriptions = ((stratégie_a, stratégie_b) if numéro % 2 == 0
+                            else (stratégie_b, stratégie_a))
+            futurs.append(exécuteur.submit(jouer_partie, numéro, descriptions,
+                                           hasard.getrandbits(32), coups_max, profils))
+        for futur in concurrent.futures.as_completed(futurs):
+            résultat, joués = futur.result()
+            if enregistrement is not None:
+                enregistrement.écrire(résultat['joueurs'], joués, résultat['gagnant'])
+            fichier.write(json.dumps(résultat, ensure_ascii=False) + '\n')
+            fichier.flush()
+            if résultat['gagnant'] is None:
+                totaux[None] += 1
+            else:
+                premier = résultat['partie'] % 2 == 0
+                totaux['A' if (résultat['gagnant'] == 1) == premier else 'B'] += 1
+    durée = time.perf_counter() - début
+    return {'stratégies': {'A': stratégie_a, 'B': stratégie_b},
+            'victoires': {'A': totaux['A'], 'B': totaux['B']},
+            'nulles': totaux[None],
+            'parties': parties,
+            'durée': durée,
+            'parties_par_seconde': parties / durée if durée else 0.0}
+
+
+def analyser_commande():
+    """Traite les options passées en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Tournoi Quoridor entre stratégies")
+
+    parser.add_argument("stratégie_a", help="Stratégie A, par exemple alphabeta:profondeur=2")
+
+    parser.add_argument("stratégie_b", help="Stratégie B, par exemple heuristique")
+
+    parser.add_argument("-n", "--parties", type=int, default=20,
+                        help="Nombre de parties")
+
+    parser.add_argument("-p", "--processus", type=int, default=None,
+                        help="Nombre de processus (tous les coeurs par défaut)")
+
+    parser.add_argument("-o", "--sortie", default="tournoi.jsonl",
+                        help="Fichier JSON lines des résultats")
+
+    parser.add_argument("--coups-max", type=int, default=200,
+                        help="Nombre de coups au-delà duquel la partie est nulle")
+
+    parser.add_argument("--graine", type=int, default=0, help="Graine aléatoire")
+
+    parser.add_argument("--enregistrer", default=None,
+                        help="Fichier de parties (format enregistrement) où ajouter les coups")
+
+    parser.add_argument("--livre", default=None,
+                        help="Livre d'ouvertures (module livre) consulté par jouer_coup")
+
+    parser.add_argument("--profils", default=None,
+                        help="Dossier où écrire le profil de chaque partie")
+
+    return parser.parse_args()
+
+
+def main():
+    """Lance le tournoi et affiche les totaux."""
+    args = analyser_commande()
+    for description in (args.stratégie_a, args.stratégie_b):
+        analyser_stratégie(description)
+    if args.profils:
+        os.makedirs(args.profils, exist_ok=True)
+    enregistrement = ÉcrivainParties(args.enregistrer) if args.enregistrer else None
+    try:
+        with open(args.sortie, 'a', encoding='utf-8') as fichier:
+            totaux = tournoi(args.stratégie_a, args.stratégie_b, args.parties, fichier,
+                             args.processus, args.graine, args.coups_max, args.profils,
+                             enregistrement, args.livre)
+    finally:
+        if enregistrement is not None:
+            enregistrement.fermer()
+    for côté, victoires in totaux['victoires'].items():
+        print(f"{côté} ({totaux['stratégies'][côté]}): {victoires}/{totaux['parties']} "
+              f"({100 * victoires / totaux['parties']:.1f} %)")
+    print(f"nulles: {totaux['nulles']}")
+    print(f"{totaux['parties_par_seconde']:.2f} parties/s en {totaux['durée']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()